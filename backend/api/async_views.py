@@ -0,0 +1,108 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .middleware import counting_connections
+from .views import IngredientViewSet, RecipeViewSet, TagViewSet
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Возвращает пул потоков асинхронных представлений процесса."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_READ_THREADS,
+                thread_name_prefix="async-read",
+            )
+    return _executor
+
+
+def async_view(view):
+    """
+    Оборачивает синхронное представление DRF в корутину для ASGI.
+
+    В Django 3.2 нет асинхронного ORM и кэша, поэтому представление
+    выполняется целиком, вместе с отрисовкой ответа, в собственном пуле
+    потоков размером ASYNC_READ_THREADS. Без этого ASGI-обработчик Django
+    выполняет все синхронные представления процесса в одном общем потоке.
+    Медленные клиенты при этом обслуживаются циклом событий и не занимают
+    поток. Соединения с БД закрываются по тем же правилам, что и в конце
+    обычного запроса. Запросы к БД в потоках пула учитываются
+    QueryInstrumentationMiddleware, если она включена.
+    """
+
+    def run(request, *args, **kwargs):
+        close_old_connections()
+        try:
+            with counting_connections():
+                response = view(request, *args, **kwargs)
+                if callable(getattr(response, "render", None)):
+                    response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    async def wrapper(request, *args, **kwargs):
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(),
+            functools.partial(context.run, run, request, *args, **kwargs),
+        )
+
+    wrapper.csrf_exempt = True
+    return wrapper
+
+
+def read_only(read_view, write_view):
+    """
+    Направляет GET и HEAD в асинхронное представление чтения, а остальные
+    методы - в синхронное представление, которое выполняется так же, как
+    любое синхронное представление Django под ASGI, и с тем же учетом
+    запросов QueryInstrumentationMiddleware.
+    """
+
+    def write(request, *args, **kwargs):
+        with counting_connections():
+            return write_view(request, *args, **kwargs)
+
+    write = sync_to_async(write, thread_sensitive=True)
+
+    async def view(request, *args, **kwargs):
+        if request.method in ("GET", "HEAD"):
+            return await read_view(request, *args, **kwargs)
+        return await write(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    return view
+
+
+recipe_list = read_only(
+    async_view(RecipeViewSet.as_view({"get": "list"})),
+    RecipeViewSet.as_view({"post": "create"}),
+)
+recipe_detail = read_only(
+    async_view(RecipeViewSet.as_view({"get": "retrieve"})),
+    RecipeViewSet.as_view(
+        {
+            "put": "update",
+            "patch": "partial_update",
+            "delete": "destroy",
+        }
+    ),
+)
+tag_list = async_view(TagViewSet.as_view({"get": "list"}))
+tag_detail = async_view(TagViewSet.as_view({"get": "retrieve"}))
+ingredient_list = async_view(IngredientViewSet.as_view({"get": "list"}))
+ingredient_detail = async_view(
+    IngredientViewSet.as_view({"get": "retrieve"})
+)
@@ -0,0 +1,33 @@
+import os
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def check_shopping_cart_pdf_font(app_configs, **kwargs):
+    """
+    Проверяет, что для PDF-списка покупок доступен шрифт с кириллицей.
+
+    Экспорт в PDF необязателен, поэтому отсутствие шрифта - только
+    предупреждение: команды manage.py (check, migrate, runserver) не
+    блокируются, а проблема видна до первой загрузки PDF-списка.
+    """
+    from .renderers import REPORTLAB_INSTALLED
+
+    if not REPORTLAB_INSTALLED or os.path.isfile(
+        settings.SHOPPING_CART_PDF_FONT
+    ):
+        return []
+    return [
+        Warning(
+            "Не найден шрифт для PDF-списка покупок: "
+            f"{settings.SHOPPING_CART_PDF_FONT}. Загрузка списка в PDF "
+            "будет завершаться ошибкой.",
+            hint=(
+                "Установите пакет fonts-dejavu-core или укажите путь к "
+                "TTF-шрифту с кириллицей в SHOPPING_CART_PDF_FONT."
+            ),
+            id="api.W001",
+        )
+    ]
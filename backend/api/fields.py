@@ -0,0 +1,159 @@
+from collections.abc import Mapping
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+
+from drf_extra_fields.fields import Base64FileField
+
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+
+
+class Base64RawImageField(Base64FileField):
+    """
+    Поле для загрузки изображения в Base64 без его декодирования Pillow.
+
+    Тип изображения определяется по сигнатуре файла, а полная проверка,
+    удаление EXIF и перекодирование выполняются после сохранения рецепта
+    в фоновом обработчике (recipes.images).
+    """
+
+    ALLOWED_TYPES = ("jpg", "png", "gif", "webp")
+    INVALID_FILE_MESSAGE = "Загрузите корректное изображение."
+    INVALID_TYPE_MESSAGE = "Не удалось определить тип изображения."
+
+    def get_file_extension(self, filename, decoded_file):
+        for signature, extension in IMAGE_SIGNATURES:
+            if decoded_file.startswith(signature):
+                return extension
+        if decoded_file[:4] == b"RIFF" and decoded_file[8:12] == b"WEBP":
+            return "webp"
+        return None
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField, загружающий объекты одним запросом in_bulk.
+
+    С many=True поле проверяет весь список сразу. Внутри вложенного
+    сериализатора с BulkRelatedListSerializer объекты всех элементов
+    загружаются списочным сериализатором заранее. Без предварительной
+    загрузки поле работает как обычный PrimaryKeyRelatedField.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.preloaded = None
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def to_pk(self, data):
+        """
+        Приводит значение к типу первичного ключа модели.
+
+        Raises:
+            TypeError, ValueError, django.core.exceptions.ValidationError:
+            Если значение не может быть первичным ключом.
+        """
+        if isinstance(data, bool):
+            raise TypeError
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        return self.get_queryset().model._meta.pk.to_python(data)
+
+    def preload(self, values):
+        """
+        Загружает объекты для всех корректных значений одним запросом.
+        Некорректные значения пропускаются: ошибка по ним будет выдана
+        при проверке соответствующего элемента.
+        """
+        pks = set()
+        for value in values:
+            try:
+                pks.add(self.to_pk(value))
+            except (TypeError, ValueError, DjangoValidationError):
+                continue
+        self.preloaded = self.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        if self.preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            pk = self.to_pk(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in self.preloaded:
+            self.fail("does_not_exist", pk_value=data)
+        return self.preloaded[pk]
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """
+    Список BulkPrimaryKeyRelatedField, проверяемый одним запросом.
+
+    Ошибки возвращаются по индексам элементов, как в ListField.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        data = list(data)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        self.child_relation.preload(data)
+        try:
+            result, errors = [], {}
+            for index, item in enumerate(data):
+                try:
+                    result.append(self.child_relation.to_internal_value(item))
+                except serializers.ValidationError as error:
+                    errors[index] = error.detail
+        finally:
+            self.child_relation.preloaded = None
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return result
+
+
+class BulkRelatedListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer, который перед проверкой элементов загружает объекты
+    каждого BulkPrimaryKeyRelatedField дочернего сериализатора одним
+    запросом на поле.
+    """
+
+    def get_bulk_fields(self):
+        return [
+            field
+            for field in self.child.fields.values()
+            if isinstance(field, BulkPrimaryKeyRelatedField)
+            and not field.read_only
+        ]
+
+    def to_internal_value(self, data):
+        fields = self.get_bulk_fields() if isinstance(data, list) else []
+        for field in fields:
+            field.preload(
+                item[field.field_name]
+                for item in data
+                if isinstance(item, Mapping) and field.field_name in item
+            )
+        try:
+            return super().to_internal_value(data)
+        finally:
+            for field in fields:
+                field.preloaded = None
@@ -1,6 +1,13 @@
 from django_filters.rest_framework import FilterSet, filters
 
+from recipes.coverage import filter_by_coverage
+from recipes.ingredient_index import ingredient_index
 from recipes.models import Ingredient, Recipe, Tag
+from recipes.search import search_recipes
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    """Фильтр по списку чисел, переданных через запятую."""
 
 
 class RecipeFilter(FilterSet):
@@ -23,6 +30,11 @@ class RecipeFilter(FilterSet):
     is_in_shopping_cart = filters.NumberFilter(
         method="filter_is_in_shopping_cart"
     )
+    search = filters.CharFilter(method="filter_search")
+    ingredients = NumberInFilter(method="filter_ingredients")
+    max_missing = filters.NumberFilter(
+        method="filter_max_missing", min_value=0
+    )
 
     class Meta:
         model = Recipe
@@ -31,6 +43,9 @@ class RecipeFilter(FilterSet):
             "author",
             "is_favorited",
             "is_in_shopping_cart",
+            "search",
+            "ingredients",
+            "max_missing",
         ]
 
     def filter_is_favorited(self, queryset, name, value):
@@ -45,14 +60,49 @@ class RecipeFilter(FilterSet):
             return queryset.filter(shoppingcarts__user=self.request.user)
         return queryset.exclude(shoppingcarts__user=self.request.user)
 
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск по названию, описанию и ингредиентам рецепта.
+        Результаты сортируются по релевантности.
+        """
+        return search_recipes(queryset, value)
+
+    def filter_ingredients(self, queryset, name, value):
+        """
+        Рецепты, которые можно приготовить из перечисленных ингредиентов.
+
+        Допустимое число недостающих ингредиентов задается параметром
+        max_missing (по умолчанию 0). Рецепты сортируются по числу
+        недостающих ингредиентов.
+        """
+        max_missing = self.form.cleaned_data.get("max_missing") or 0
+        return filter_by_coverage(
+            queryset, [int(pk) for pk in value], int(max_missing)
+        )
+
+    def filter_max_missing(self, queryset, name, value):
+        """Параметр учитывается в filter_ingredients."""
+        return queryset
+
 
 class IngredientFilter(FilterSet):
     """Фильтр для ингредиентов, позволяющийосуществлять поиск
        по имени ингредиента.
     """
 
-    name = filters.CharFilter(lookup_expr='startswith')
+    name = filters.CharFilter(method="filter_name")
 
     class Meta:
         model = Ingredient
         fields = ['name']
+
+    def filter_name(self, queryset, name, value):
+        """
+        Фильтрует ингредиенты по началу наименования без учета регистра.
+
+        Поиск выполняется по индексу в памяти процесса, из базы данных
+        ингредиенты выбираются по первичному ключу.
+        """
+        return queryset.filter(
+            pk__in=ingredient_index.search(value)
+        ).order_by("name")
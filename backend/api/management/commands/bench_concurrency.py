@@ -0,0 +1,161 @@
+import asyncio
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .load_foodgram import percentile
+
+
+def process_tree(pid):
+    """Возвращает pid процесса и всех его потомков."""
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        for children in Path(f"/proc/{current}/task").glob("*/children"):
+            stack.extend(int(child) for child in children.read_text().split())
+    return pids
+
+
+def tree_rss(pid):
+    """Суммарный резидентный объем памяти процесса и потомков, байты."""
+    total = 0
+    for current in process_tree(pid):
+        try:
+            status = Path(f"/proc/{current}/status").read_text()
+        except FileNotFoundError:
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1]) * 1024
+    return total
+
+
+def build_request(url, token):
+    """Формирует GET-запрос HTTP/1.1 с закрытием соединения."""
+    path = url.path + (f"?{url.query}" if url.query else "")
+    headers = f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\n"
+    if token:
+        headers += f"Authorization: Token {token}\r\n"
+    return (headers + "Connection: close\r\n\r\n").encode()
+
+
+async def fetch(host, port, request, client_delay):
+    """
+    Отправляет запрос и читает ответ целиком.
+
+    При client_delay > 0 запрос передается двумя частями с паузой между
+    ними, как это делает медленный клиент.
+
+    Returns:
+        bool: True, если сервер ответил 200.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    if client_delay:
+        middle = len(request) // 2
+        writer.write(request[:middle])
+        await writer.drain()
+        await asyncio.sleep(client_delay)
+        request = request[middle:]
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    return b" 200 " in status_line
+
+
+class Command(BaseCommand):
+    help = (
+        "Держит заданное число одновременных соединений с запущенным "
+        "сервером (WSGI или ASGI) и выводит пропускную способность, "
+        "задержки и память сервера на один запрос в обработке. "
+        "Запустите дважды - против gunicorn foodgram.wsgi и против "
+        "gunicorn -c gunicorn_asgi.conf.py - и сравните результаты."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", default="http://127.0.0.1:8000/api/recipes/?limit=6"
+        )
+        parser.add_argument("--concurrency", type=int, default=500)
+        parser.add_argument(
+            "--duration", type=float, default=30, help="Секунды."
+        )
+        parser.add_argument(
+            "--pid",
+            type=int,
+            help="PID мастер-процесса сервера для замера памяти.",
+        )
+        parser.add_argument("--token", help="Токен пользователя.")
+        parser.add_argument(
+            "--client-delay",
+            type=float,
+            default=0,
+            help="Пауза медленного клиента посреди запроса, секунды.",
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme != "http":
+            raise CommandError("Поддерживается только http.")
+        if options["pid"] and not Path(f"/proc/{options['pid']}").exists():
+            raise CommandError("Процесс сервера не найден.")
+
+        result = asyncio.run(self.run(url, options))
+        latencies = sorted(result["latencies"])
+        wall_time = result["wall_time"]
+        self.stdout.write(
+            f"concurrency={options['concurrency']} n={len(latencies)} "
+            f"errors={result['errors']} "
+            f"rps={len(latencies) / wall_time:.1f} "
+            f"p50={percentile(latencies, 50) * 1000:.1f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.1f}ms"
+        )
+        if options["pid"]:
+            idle, peak = result["idle_rss"], result["peak_rss"]
+            per_request = (peak - idle) / options["concurrency"]
+            self.stdout.write(
+                f"rss idle={idle / 2**20:.1f}MiB peak={peak / 2**20:.1f}MiB "
+                f"per in-flight request={per_request / 2**10:.1f}KiB"
+            )
+
+    async def run(self, url, options):
+        host, port = url.hostname, url.port or 80
+        request = build_request(url, options["token"])
+
+        result = {"latencies": [], "errors": 0, "idle_rss": 0, "peak_rss": 0}
+        pid = options["pid"]
+        if pid:
+            result["idle_rss"] = result["peak_rss"] = tree_rss(pid)
+        deadline = time.monotonic() + options["duration"]
+
+        async def client():
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    ok = await fetch(
+                        host, port, request, options["client_delay"]
+                    )
+                except OSError:
+                    ok = False
+                    await asyncio.sleep(0.1)
+                if ok:
+                    result["latencies"].append(time.perf_counter() - start)
+                else:
+                    result["errors"] += 1
+
+        async def sample_memory():
+            while time.monotonic() < deadline:
+                result["peak_rss"] = max(result["peak_rss"], tree_rss(pid))
+                await asyncio.sleep(0.2)
+
+        tasks = [client() for _ in range(options["concurrency"])]
+        if pid:
+            tasks.append(sample_memory())
+        started = time.monotonic()
+        await asyncio.gather(*tasks)
+        result["wall_time"] = time.monotonic() - started
+        return result
@@ -0,0 +1,101 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, Q
+
+from recipes.coverage import load_compositions, recipe_coverage_index
+from recipes.models import Recipe
+
+
+def coverage_by_group_by(ingredient_ids, max_missing):
+    """
+    Тот же запрос "что приготовить" через ORM: GROUP BY по всей таблице
+    связей рецептов и ингредиентов.
+    """
+    recipes = (
+        Recipe.objects.annotate(
+            total=Count("recipe_ingredients"),
+            present=Count(
+                "recipe_ingredients",
+                filter=Q(recipe_ingredients__ingredient_id__in=ingredient_ids),
+            ),
+        )
+        .filter(present__gt=0, total__lte=F("present") + max_missing)
+        .values_list("total", "present", "id")
+    )
+    return sorted(
+        (total - present, recipe_id) for total, present, recipe_id in recipes
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает поиск рецептов по имеющимся ингредиентам через "
+        "инвертированный индекс и через GROUP BY в базе данных."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[5, 20, 50],
+            help="Количество имеющихся ингредиентов.",
+        )
+        parser.add_argument("--max-missing", type=int, default=1)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        compositions = load_compositions()
+        if not compositions:
+            raise CommandError("В базе данных нет рецептов с ингредиентами.")
+        recipe_coverage_index.sync()
+        self.stdout.write(
+            f"Индекс: {len(compositions)} рецептов, построен за "
+            f"{time.perf_counter() - start:.2f} с."
+        )
+
+        # Популярные ингредиенты попадают в набор чаще, как и в рецептах.
+        used = [
+            pk for ingredients in compositions.values() for pk in ingredients
+        ]
+        rng = random.Random(options["seed"])
+        max_missing = options["max_missing"]
+        for size in options["sizes"]:
+            pantries = []
+            for _ in range(options["repeat"]):
+                pantry = set()
+                while len(pantry) < size:
+                    pantry.add(rng.choice(used))
+                pantries.append(pantry)
+
+            timings = {"index": 0.0, "group_by": 0.0}
+            matches = 0
+            for pantry in pantries:
+                start = time.perf_counter()
+                found = recipe_coverage_index.coverage(pantry, max_missing)
+                timings["index"] += time.perf_counter() - start
+
+                start = time.perf_counter()
+                expected = coverage_by_group_by(pantry, max_missing)
+                timings["group_by"] += time.perf_counter() - start
+
+                if sorted(found) != expected:
+                    raise CommandError(
+                        "Результаты индекса и GROUP BY различаются: "
+                        f"{pantry}"
+                    )
+                matches += len(found)
+
+            index, group_by = (
+                timings[name] / len(pantries) * 1000
+                for name in ("index", "group_by")
+            )
+            self.stdout.write(
+                f"ingredients={size:<4} "
+                f"recipes={matches / len(pantries):<8.1f}"
+                f"index={index:.2f}ms group_by={group_by:.2f}ms"
+            )
@@ -0,0 +1,192 @@
+import csv
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Sum
+
+from api.renderers import SHOPPING_CART_RENDERERS
+from api.utils import get_shopping_cart_ingredients
+from foodgram.settings import INGREDIENT_CSV_FILE_PATH
+from recipes.models import Recipe, RecipeIngredient, ShoppingCart
+from recipes.units import normalize_shopping_list
+from users.models import User
+
+INGREDIENTS_PER_RECIPE = 8
+
+
+def load_catalog():
+    """Читает каталог ингредиентов из CSV-файла."""
+    file_path = f"{INGREDIENT_CSV_FILE_PATH}/ingredients.csv"
+    with open(file_path, "r", encoding="utf-8") as csv_file:
+        return [tuple(row) for row in csv.reader(csv_file)]
+
+
+def make_cart(catalog, recipes_count, seed=0):
+    """
+    Формирует агрегированный список покупок для корзины из recipes_count
+    случайных рецептов, как его возвращает get_shopping_cart_ingredients.
+    """
+    rng = random.Random(seed)
+    amounts = {}
+    for _ in range(recipes_count):
+        for name, unit in rng.sample(catalog, INGREDIENTS_PER_RECIPE):
+            amounts[(name, unit)] = (
+                amounts.get((name, unit), 0) + rng.randint(1, 500)
+            )
+    return [
+        {"name": name, "measurement_unit": unit, "amount": amount}
+        for (name, unit), amount in sorted(amounts.items())
+    ]
+
+
+def make_grouped_rows(catalog, lines_count, seed=0):
+    """
+    Формирует строки в том виде, в котором их возвращает группировка
+    списка покупок в базе данных: до трех единиц на ингредиент,
+    упорядоченные по наименованию.
+    """
+    rng = random.Random(seed)
+    names = sorted({name for name, _ in catalog})
+    units = sorted({unit for _, unit in catalog})
+    rows = set()
+    while len(rows) < lines_count:
+        name = rng.choice(names)
+        for unit in rng.sample(units, rng.randint(1, 3)):
+            rows.add((name, unit, rng.randint(1, 2000)))
+    return [
+        {"name": name, "measurement_unit": unit, "amount": amount}
+        for name, unit, amount in sorted(rows)[:lines_count]
+    ]
+
+
+def plain_shopping_cart_ingredients(user):
+    """Группировка по наименованию и единице без перевода единиц."""
+    return (
+        RecipeIngredient.objects.filter(recipe__shoppingcarts__user=user)
+        .values(
+            name=F("ingredient__name"),
+            measurement_unit=F("ingredient__measurement_unit"),
+        )
+        .annotate(amount=Sum("amount"))
+        .order_by("name", "measurement_unit")
+    )
+
+
+def best_time(function, repeat):
+    """Возвращает результат и наименьшее время выполнения функции."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+class Command(BaseCommand):
+    help = "Замеряет пропускную способность рендереров списка покупок."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[10, 100, 1000],
+            help="Количество рецептов в корзине.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Количество повторов замера.",
+        )
+        parser.add_argument(
+            "--lines",
+            nargs="+",
+            type=int,
+            default=[1000, 10000, 100000],
+            help="Количество строк для замера сведения единиц.",
+        )
+        parser.add_argument(
+            "--cart-recipes",
+            type=int,
+            default=0,
+            help=(
+                "Количество рецептов во временной корзине для замера "
+                "запроса к базе данных. 0 - не замерять."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        catalog = load_catalog()
+        self.bench_renderers(catalog, options)
+        self.bench_aggregation(catalog, options)
+        if options["cart_recipes"]:
+            self.bench_database(options)
+
+    def bench_renderers(self, catalog, options):
+        """Замеряет рендереры на агрегированных списках покупок."""
+        for size in options["sizes"]:
+            cart = make_cart(catalog, size)
+            for renderer_class in SHOPPING_CART_RENDERERS:
+                renderer = renderer_class()
+                best = None
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    content_length = sum(
+                        len(chunk) for chunk in renderer.stream(iter(cart))
+                    )
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+
+                self.stdout.write(
+                    f"recipes={size:<5} format={renderer.format:<5} "
+                    f"rows={len(cart):<5} bytes={content_length:<8} "
+                    f"time={best * 1000:.2f}ms "
+                    f"rows/s={len(cart) / best:,.0f}"
+                )
+
+    def bench_aggregation(self, catalog, options):
+        """Замеряет сведение единиц по строкам, сгруппированным в БД."""
+        for lines_count in options["lines"]:
+            rows = make_grouped_rows(catalog, lines_count)
+            result, best = best_time(
+                lambda: list(normalize_shopping_list(iter(rows))),
+                options["repeat"],
+            )
+            self.stdout.write(
+                f"normalize lines={len(rows):<7} output={len(result):<7} "
+                f"time={best * 1000:.2f}ms "
+                f"lines/s={len(rows) / best:,.0f}"
+            )
+
+    def bench_database(self, options):
+        """
+        Замеряет запрос списка покупок для временной корзины из
+        cart_recipes рецептов. Корзина удаляется откатом транзакции.
+        """
+        user = User.objects.order_by("id").first()
+        recipes = Recipe.objects.order_by("?")[: options["cart_recipes"]]
+        with transaction.atomic():
+            ShoppingCart.objects.filter(user=user).delete()
+            ShoppingCart.objects.bulk_create(
+                [ShoppingCart(user=user, recipe=recipe) for recipe in recipes]
+            )
+            lines = RecipeIngredient.objects.filter(
+                recipe__shoppingcarts__user=user
+            ).count()
+            for title, function in (
+                ("plain", plain_shopping_cart_ingredients),
+                ("units", get_shopping_cart_ingredients),
+            ):
+                result, best = best_time(
+                    lambda: list(function(user)), options["repeat"]
+                )
+                self.stdout.write(
+                    f"database {title:<5} recipes={len(recipes):<6} "
+                    f"lines={lines:<7} output={len(result):<6} "
+                    f"time={best * 1000:.2f}ms"
+                )
+            transaction.set_rollback(True)
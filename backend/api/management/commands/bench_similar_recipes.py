@@ -0,0 +1,180 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from rest_framework.test import APIClient
+
+from recipes.models import SimilarRecipe
+from recipes.similarity import (
+    SIMILARITY_INSTALLED,
+    SIMILARITY_METRICS,
+    SIMILARITY_REQUIREMENTS,
+    build_matrix,
+    top_k_neighbours,
+)
+
+from .bench_shopping_cart import load_catalog
+
+if SIMILARITY_INSTALLED:
+    import numpy as np
+
+
+def make_pairs(recipes_count, ingredients_count, per_recipe, zipf, seed):
+    """
+    Формирует пары (рецепт, ингредиент) с популярностью ингредиентов по
+    закону Ципфа, как в seed_foodgram.
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, ingredients_count + 1) ** zipf
+    ingredients = rng.choice(
+        ingredients_count,
+        size=recipes_count * per_recipe,
+        p=weights / weights.sum(),
+    )
+    recipes = np.repeat(np.arange(recipes_count), per_recipe)
+    return np.column_stack([recipes, ingredients])
+
+
+def naive_neighbours(compositions, row, k):
+    """
+    Попарный расчет соседей одного рецепта, как при вычислении
+    сходства на каждый запрос.
+    """
+    target = compositions[row]
+    scores = [
+        (len(target & other) / len(target | other), index)
+        for index, other in enumerate(compositions)
+        if index != row
+    ]
+    scores.sort(reverse=True)
+    return scores[:k]
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет расчет похожих рецептов на синтетических данных и "
+        "сравнивает чтение соседей из таблицы с попарным расчетом "
+        "на запрос."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=100000)
+        parser.add_argument(
+            "--ingredients-per-recipe", type=int, default=8
+        )
+        parser.add_argument("--top-k", type=int, default=20)
+        parser.add_argument(
+            "--metric", choices=SIMILARITY_METRICS, default="jaccard"
+        )
+        parser.add_argument("--zipf", type=float, default=1.1)
+        parser.add_argument("--block-size", type=int, default=256)
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20,
+            help="Количество запросов для замера чтения соседей.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if not SIMILARITY_INSTALLED:
+            raise CommandError(
+                "Для бенчмарка нужны numpy и scipy: "
+                f"pip install -r {SIMILARITY_REQUIREMENTS}"
+            )
+        pairs = make_pairs(
+            options["recipes"],
+            len(load_catalog()),
+            options["ingredients_per_recipe"],
+            options["zipf"],
+            options["seed"],
+        )
+
+        start = time.perf_counter()
+        _, matrix = build_matrix(pairs)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        neighbours, _ = top_k_neighbours(
+            matrix,
+            options["top_k"],
+            options["metric"],
+            options["block_size"],
+        )
+        top_k_time = time.perf_counter() - start
+        block_bytes = options["block_size"] * matrix.shape[0] * 4
+
+        self.stdout.write(
+            f"recipes={matrix.shape[0]} ingredients={matrix.shape[1]} "
+            f"links={matrix.nnz} build={build_time:.2f}s "
+            f"top_k={top_k_time:.1f}s "
+            f"({matrix.shape[0] / top_k_time:,.0f} recipes/s, "
+            f"block={block_bytes / 2**20:.0f} MiB, "
+            f"neighbours={int((neighbours >= 0).sum())})"
+        )
+
+        self.bench_naive(matrix, options)
+        self.bench_lookup(options["requests"])
+
+    def bench_naive(self, matrix, options):
+        """Замеряет попарный расчет соседей на один запрос."""
+        compositions = [
+            frozenset(matrix.indices[begin:end].tolist())
+            for begin, end in zip(matrix.indptr[:-1], matrix.indptr[1:])
+        ]
+        rng = random.Random(options["seed"])
+        rows = [
+            rng.randrange(len(compositions)) for _ in range(3)
+        ]
+        start = time.perf_counter()
+        for row in rows:
+            naive_neighbours(compositions, row, options["top_k"])
+        elapsed = (time.perf_counter() - start) / len(rows)
+        self.stdout.write(
+            f"pairwise per request: {elapsed * 1000:.1f}ms"
+        )
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    def bench_lookup(self, requests):
+        """Замеряет ответ эндпоинта похожих рецептов на текущей базе."""
+        recipe_ids = list(
+            SimilarRecipe.objects.filter(rank=1).values_list(
+                "recipe_id", flat=True
+            )[:requests]
+        )
+        if not recipe_ids:
+            self.stdout.write(
+                "Таблица похожих рецептов пуста: выполните "
+                "build_similar_recipes для замера чтения."
+            )
+            return
+
+        lookups = []
+        for recipe_id in recipe_ids:
+            start = time.perf_counter()
+            list(
+                SimilarRecipe.objects.filter(recipe_id=recipe_id)
+                .order_by("rank")
+                .values_list("similar_id", flat=True)
+            )
+            lookups.append(time.perf_counter() - start)
+
+        client = APIClient()
+        responses, queries = [], 0
+        for recipe_id in recipe_ids:
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                client.get(f"/api/recipes/{recipe_id}/similar/")
+                responses.append(time.perf_counter() - start)
+            queries = max(queries, len(context))
+
+        lookups.sort()
+        responses.sort()
+        self.stdout.write(
+            f"precomputed lookup: p50={lookups[len(lookups) // 2] * 1000:.2f}"
+            f"ms; endpoint: p50={responses[len(responses) // 2] * 1000:.1f}"
+            f"ms queries={queries}"
+        )
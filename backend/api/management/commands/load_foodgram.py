@@ -0,0 +1,136 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Ingredient
+
+# Доля каждого сценария в смешанной нагрузке.
+WORKLOAD = {
+    "recipes": 60,
+    "subscriptions": 15,
+    "ingredients": 20,
+    "download_shopping_cart": 5,
+}
+
+
+def percentile(values, percent):
+    """Возвращает перцентиль отсортированного списка значений."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def build_url(scenario, rng, prefixes):
+    """Формирует адрес запроса для сценария нагрузки."""
+    if scenario == "recipes":
+        return f"/api/recipes/?page={rng.randint(1, 20)}&limit=6"
+    if scenario == "subscriptions":
+        return "/api/users/subscriptions/?recipes_limit=3"
+    if scenario == "ingredients":
+        return f"/api/ingredients/?name={quote(rng.choice(prefixes))}"
+    return "/api/recipes/download_shopping_cart/"
+
+
+def timed_request(url, token):
+    """
+    Выполняет GET-запрос и возвращает время ответа в секундах
+    или None, если запрос завершился ошибкой.
+    """
+    request = Request(url, headers={"Authorization": f"Token {token}"})
+    start = time.perf_counter()
+    try:
+        with urlopen(request, timeout=30) as response:
+            response.read()
+    except (HTTPError, URLError, OSError):
+        return None
+    return time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = (
+        "Воспроизводит смешанную нагрузку на запущенный сервер и выводит "
+        "p50/p95/p99 задержки и пропускную способность по сценариям. "
+        "Токены берутся из базы, заполненной командой seed_foodgram."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url", default="http://127.0.0.1:8000"
+        )
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--duration", type=float, default=30, help="Секунды."
+        )
+        parser.add_argument("--tokens", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        tokens = list(
+            Token.objects.order_by("?").values_list("key", flat=True)[
+                : options["tokens"]
+            ]
+        )
+        if not tokens:
+            raise CommandError(
+                "Нет токенов пользователей. Выполните seed_foodgram."
+            )
+        prefixes = sorted(
+            {
+                name[:length]
+                for name in Ingredient.objects.values_list("name", flat=True)
+                for length in (1, 2, 3)
+            }
+        )
+
+        base_url = options["base_url"].rstrip("/")
+        scenarios = list(WORKLOAD)
+        weights = [WORKLOAD[name] for name in scenarios]
+        results = {name: [] for name in scenarios}
+        errors = {name: 0 for name in scenarios}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+
+        def worker(number):
+            rng = random.Random(options["seed"] + number)
+            while time.monotonic() < deadline:
+                scenario = rng.choices(scenarios, weights=weights)[0]
+                url = base_url + build_url(scenario, rng, prefixes)
+                elapsed = timed_request(url, rng.choice(tokens))
+                with lock:
+                    if elapsed is None:
+                        errors[scenario] += 1
+                    else:
+                        results[scenario].append(elapsed)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            list(executor.map(worker, range(options["concurrency"])))
+        wall_time = time.monotonic() - started
+
+        total = 0
+        for scenario in scenarios:
+            latencies = sorted(results[scenario])
+            total += len(latencies)
+            self.stdout.write(
+                f"{scenario:<24} n={len(latencies):<6} "
+                f"errors={errors[scenario]:<4} "
+                f"p50={percentile(latencies, 50) * 1000:7.1f}ms "
+                f"p95={percentile(latencies, 95) * 1000:7.1f}ms "
+                f"p99={percentile(latencies, 99) * 1000:7.1f}ms "
+                f"rps={len(latencies) / wall_time:7.1f}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Всего: {total} запросов за {wall_time:.1f} с, "
+                f"{total / wall_time:.1f} запросов/с."
+            )
+        )
@@ -0,0 +1,127 @@
+import asyncio
+import contextvars
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+_current_counter = contextvars.ContextVar("query_counter", default=None)
+
+
+class QueryCounter:
+    """Обертка для connection.execute_wrapper, считающая запросы и время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def count_request_query(execute, sql, params, many, context):
+    """Передает запрос счетчику текущего HTTP-запроса, если он есть."""
+    counter = _current_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+@contextmanager
+def counting_queries(counter):
+    """Делает counter счетчиком запросов текущего контекста выполнения."""
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+@contextmanager
+def counting_connections():
+    """
+    Подключает учет запросов к соединениям текущего потока на время
+    блока.
+
+    Обертка относит запросы к счетчику из контекста выполнения
+    (contextvars), поэтому блок открывают в том потоке, где выполняется
+    представление: в потоке запроса, в общем потоке синхронных
+    представлений под ASGI и в пуле асинхронных представлений. Вне
+    запроса с включенным учетом, а также на соединениях, где обертка уже
+    подключена внешним блоком, ничего не делает.
+    """
+    with ExitStack() as stack:
+        if _current_counter.get() is not None:
+            for connection in connections.all():
+                if count_request_query not in connection.execute_wrappers:
+                    stack.enter_context(
+                        connection.execute_wrapper(count_request_query)
+                    )
+        yield
+
+
+class QueryInstrumentationMiddleware(MiddlewareMixin):
+    """
+    Добавляет к ответу количество и суммарное время SQL-запросов.
+
+    Заголовки X-DB-Queries и Server-Timing выставляются, только если
+    включена настройка QUERY_INSTRUMENTATION (по умолчанию - в режиме
+    DEBUG); в остальных случаях middleware отключается при старте.
+    Middleware работает и под WSGI, и под ASGI, не заставляя Django
+    выполнять асинхронные представления синхронно.
+    Запросы, выполняемые при отдаче потокового ответа, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        with counting_queries(QueryCounter()) as counter:
+            with counting_connections():
+                response = self.get_response(request)
+        return self.add_headers(response, counter)
+
+    async def __acall__(self, request):
+        with counting_queries(QueryCounter()) as counter:
+            response = await self.get_response(request)
+        return self.add_headers(response, counter)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Под ASGI вызывает синхронное представление с учетом запросов.
+
+        Django вызывает этот метод в том же общем потоке, где затем
+        выполнил бы синхронное представление, но без точки выхода, где
+        учет можно было бы отключить. Поэтому представление вызывается
+        здесь, внутри counting_connections; middleware последняя в
+        MIDDLEWARE, и остальные process_view к этому моменту выполнены.
+        """
+        if not asyncio.iscoroutinefunction(self) or (
+            asyncio.iscoroutinefunction(view_func)
+        ):
+            return None
+        with counting_connections():
+            response = view_func(request, *view_args, **view_kwargs)
+            if callable(getattr(response, "render", None)):
+                response.render()
+        return response
+
+    def add_headers(self, response, counter):
+        response["X-DB-Queries"] = str(counter.count)
+        response["Server-Timing"] = (
+            f'db;dur={counter.duration * 1000:.2f};'
+            f'desc="{counter.count} queries"'
+        )
+        return response
@@ -0,0 +1,200 @@
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+
+from foodgram.routers import (
+    is_pinned_to_primary,
+    pin_to_primary,
+    reset_replica,
+    use_replica,
+)
+
+from recipes.catalog import get_catalog_version, get_recipes_version
+
+
+class ResponseCacheStats:
+    """Счетчики попаданий и промахов кэша ответов в текущем процессе."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+RESPONSE_CACHE_STATS = {}
+
+
+class VersionedResponseCacheMixin:
+    """
+    Кэширует JSON-ответы list и retrieve для GET-запросов.
+
+    Ключ кэша включает счетчики версий данных (get_cache_versions), адрес
+    и нормализованную строку запроса, поэтому увеличение любого из
+    счетчиков сразу делает устаревшими все сохраненные ответы. Ответ
+    содержит строгий ETag, на запрос с совпадающим If-None-Match
+    возвращается 304, а заголовок X-Cache показывает HIT или MISS.
+    """
+
+    cache_prefix = None
+
+    @classmethod
+    def get_cache_stats(cls):
+        return RESPONSE_CACHE_STATS.setdefault(
+            cls.cache_prefix, ResponseCacheStats()
+        )
+
+    def get_cache_versions(self):
+        return ()
+
+    def get_cache_timeout(self):
+        return None
+
+    def use_response_cache(self, request):
+        return request.accepted_renderer.format == "json"
+
+    def get_response_cache_key(self, request):
+        query = sorted(
+            (name, sorted(values))
+            for name, values in request.query_params.lists()
+            if any(values)
+        )
+        versions = ":".join(str(v) for v in self.get_cache_versions())
+        url = request.build_absolute_uri(request.path)
+        return (
+            f"{self.cache_prefix}:{versions}:{url}:"
+            f"{hashlib.md5(repr(query).encode()).hexdigest()}"
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if not self.use_response_cache(request):
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        hit = cached is not None
+        self.get_cache_stats().record(hit)
+        if not hit:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            content = JSONRenderer().render(response.data)
+            cached = (f'"{hashlib.md5(content).hexdigest()}"', content)
+            cache.set(key, cached, self.get_cache_timeout())
+
+        etag, content = cached
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = etag
+        response["X-Cache"] = "HIT" if hit else "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CatalogCacheMixin(VersionedResponseCacheMixin):
+    """
+    Кэширует ответы справочников (теги, ингредиенты) до изменения
+    версии каталога.
+    """
+
+    cache_prefix = "catalog"
+
+    def get_cache_versions(self):
+        return (get_catalog_version(),)
+
+    def get_cache_timeout(self):
+        return settings.CATALOG_CACHE_TIMEOUT
+
+
+class AnonymousRecipeCacheMixin(VersionedResponseCacheMixin):
+    """
+    Кэширует список и карточки рецептов для анонимных пользователей.
+
+    Для анонимных пользователей is_favorited и is_in_shopping_cart всегда
+    ложны, поэтому ответ зависит только от данных. Версия рецептов
+    увеличивается при изменении рецептов, их ингредиентов и авторов,
+    версия каталога - при изменении тегов и ингредиентов.
+    """
+
+    cache_prefix = "recipes"
+
+    def get_cache_versions(self):
+        return (get_recipes_version(), get_catalog_version())
+
+    def get_cache_timeout(self):
+        return settings.RECIPE_CACHE_TIMEOUT
+
+    def use_response_cache(self, request):
+        return (
+            request.user.is_anonymous
+            and super().use_response_cache(request)
+        )
+
+
+class ReplicaReadMixin:
+    """
+    Направляет безопасные запросы представления на реплики для чтения.
+
+    Решение принимается после аутентификации: если пользователь недавно
+    выполнял запись, его чтения остаются в основной базе. Успешный
+    небезопасный запрос закрепляет пользователя за основной базой на
+    REPLICA_PIN_SECONDS секунд. replica_read_actions ограничивает список
+    действий, которые можно читать с реплик (None - все).
+    """
+
+    replica_read_actions = None
+
+    def use_replica_for(self, request):
+        return (
+            request.method in SAFE_METHODS
+            and (
+                self.replica_read_actions is None
+                or self.action in self.replica_read_actions
+            )
+            and not is_pinned_to_primary(request.user)
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._replica_token = use_replica(self.use_replica_for(request))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            reset_replica(token)
+            self._replica_token = None
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,97 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class LimitPageNumberPagination(PageNumberPagination):
+    """
+    Постраничная навигация с размером страницы из параметра limit,
+    который передает фронтенд.
+    """
+
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+
+class RecipeCursorPagination(CursorPagination):
+    """
+    Курсорная навигация по рецептам в порядке публикации.
+
+    Следующая страница выбирается условием по индексу (-pub_date, -id)
+    без OFFSET и COUNT(*), поэтому ее стоимость не зависит от глубины.
+    """
+
+    ordering = ("-pub_date", "-id")
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+
+class RecipePagination(LimitPageNumberPagination):
+    """
+    Постраничная навигация по рецептам.
+
+    По умолчанию работает по номеру страницы. Курсорный режим включается
+    параметром pagination=cursor; ссылки next и previous этого режима
+    содержат параметр cursor. Курсор задает порядок публикации, поэтому
+    вместе с фильтрами, сортирующими по релевантности (search и
+    ingredients), курсорный режим отклоняется с ошибкой 400.
+    """
+
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+    cursor_pagination_class = RecipeCursorPagination
+    ranked_query_params = ("search", "ingredients")
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def check_cursor_ordering(self, request):
+        """Отклоняет курсорный режим при сортировке по релевантности."""
+        ranked = [
+            param
+            for param in self.ranked_query_params
+            if request.query_params.get(param, "").strip()
+        ]
+        if ranked:
+            raise ValidationError(
+                {
+                    self.mode_query_param: (
+                        "Курсорная навигация недоступна вместе с "
+                        f"параметрами {', '.join(ranked)}: используйте "
+                        "постраничную навигацию."
+                    )
+                }
+            )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.check_cursor_ordering(request)
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class FeedCursorPagination(RecipeCursorPagination):
+    """Курсорная навигация по записям ленты подписок."""
+
+    ordering = ("-pub_date", "-recipe_id")
+
+
+class FeedPagination(RecipePagination):
+    """Навигация по ленте подписок: по номеру страницы или курсором."""
+
+    cursor_pagination_class = FeedCursorPagination
@@ -0,0 +1,201 @@
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework import renderers
+
+from .utils import generate_shopping_cart_txt
+
+SHOPPING_CART_HEADERS = ["Ингредиент", "Единицы измерения", "Количество"]
+
+SHOPPING_CART_RENDERERS = []
+
+
+def register_shopping_cart_renderer(renderer_class):
+    """
+    Регистрирует рендерер списка покупок.
+
+    Порядок регистрации важен: первый рендерер используется по умолчанию,
+    если клиент не указал ни параметр format, ни заголовок Accept.
+    """
+    SHOPPING_CART_RENDERERS.append(renderer_class)
+    return renderer_class
+
+
+class ShoppingCartRenderer(renderers.BaseRenderer):
+    """
+    Базовый рендерер списка покупок.
+
+    Наследники реализуют метод stream, который отдает содержимое файла
+    частями (bytes) по мере чтения строк из базы данных. Метод render
+    используется DRF только для ответов об ошибках.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    def get_filename(self):
+        return f"shopping_cart.{self.format}"
+
+    def stream(self, ingredients):
+        """
+        Генерирует содержимое файла списка покупок.
+
+        Args:
+            ingredients (Iterable[dict]): Строки с ключами name,
+            measurement_unit и amount.
+
+        Yields:
+            bytes: Очередная часть файла.
+        """
+        raise NotImplementedError
+
+
+@register_shopping_cart_renderer
+class TxtShoppingCartRenderer(ShoppingCartRenderer):
+    """
+    Текстовая таблица. Для выравнивания колонок tabulate нужны все строки
+    сразу, поэтому таблица строится в памяти и отдается построчно.
+    """
+
+    media_type = "text/plain"
+    format = "txt"
+
+    def stream(self, ingredients):
+        txt_content = generate_shopping_cart_txt(ingredients)
+        for line in txt_content.splitlines(keepends=True):
+            yield line.encode(self.charset)
+
+
+class _Echo:
+    """Объект-заглушка, возвращающий записанное значение для csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+@register_shopping_cart_renderer
+class CSVShoppingCartRenderer(ShoppingCartRenderer):
+    """CSV-файл, записываемый построчно с постоянным расходом памяти."""
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def stream(self, ingredients):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(SHOPPING_CART_HEADERS).encode(self.charset)
+        for ingredient in ingredients:
+            yield writer.writerow(
+                [
+                    ingredient["name"],
+                    ingredient["measurement_unit"],
+                    ingredient["amount"],
+                ]
+            ).encode(self.charset)
+
+
+@register_shopping_cart_renderer
+class NDJSONShoppingCartRenderer(ShoppingCartRenderer):
+    """
+    JSON Lines: по одному объекту ингредиента на строку.
+
+    Выбирается параметром format=json или заголовком
+    Accept: application/x-ndjson. Ответ не является одним JSON-документом,
+    поэтому на Accept: application/json этот рендерер не отвечает.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "json"
+
+    def stream(self, ingredients):
+        for ingredient in ingredients:
+            line = json.dumps(
+                {
+                    "name": ingredient["name"],
+                    "measurement_unit": ingredient["measurement_unit"],
+                    "amount": ingredient["amount"],
+                },
+                ensure_ascii=False,
+            )
+            yield f"{line}\n".encode(self.charset)
+
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+except ImportError:
+    REPORTLAB_INSTALLED = False
+else:
+    REPORTLAB_INSTALLED = True
+
+
+if REPORTLAB_INSTALLED:
+
+    @register_shopping_cart_renderer
+    class PDFShoppingCartRenderer(ShoppingCartRenderer):
+        """
+        PDF-документ, формируемый локально библиотекой reportlab.
+
+        Для кириллицы нужен TTF-шрифт из настройки SHOPPING_CART_PDF_FONT
+        (в Docker-образе - DejaVu Sans из пакета fonts-dejavu-core).
+        Встроенные шрифты reportlab кириллицу не отображают, поэтому без
+        шрифта документ не формируется. Документ строится целиком до
+        отправки ответа, чтобы ошибка не обрывала уже начатый ответ.
+        """
+
+        media_type = "application/pdf"
+        format = "pdf"
+        charset = None
+        font_name = "ShoppingCartFont"
+
+        def get_font_name(self):
+            if self.font_name in pdfmetrics.getRegisteredFontNames():
+                return self.font_name
+            try:
+                font = TTFont(self.font_name, settings.SHOPPING_CART_PDF_FONT)
+            except Exception as error:
+                raise ImproperlyConfigured(
+                    "Не удалось загрузить шрифт списка покупок "
+                    f"SHOPPING_CART_PDF_FONT: {error}"
+                ) from error
+            pdfmetrics.registerFont(font)
+            return self.font_name
+
+        def stream(self, ingredients):
+            return iter([self.build(ingredients)])
+
+        def build(self, ingredients):
+            rows = [SHOPPING_CART_HEADERS]
+            for ingredient in ingredients:
+                rows.append(
+                    [
+                        ingredient["name"],
+                        ingredient["measurement_unit"],
+                        ingredient["amount"],
+                    ]
+                )
+
+            table = Table(rows, repeatRows=1)
+            table.setStyle(
+                TableStyle(
+                    [
+                        ("FONTNAME", (0, 0), (-1, -1), self.get_font_name()),
+                        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                    ]
+                )
+            )
+
+            buffer = io.BytesIO()
+            SimpleDocTemplate(buffer, pagesize=A4).build([table])
+            return buffer.getvalue()
@@ -1,4 +1,4 @@
-from django.db.models import F
+from django.contrib.auth.models import AnonymousUser
 from django.db.transaction import atomic
 
 from djoser.serializers import UserCreateSerializer
@@ -7,6 +7,8 @@ from drf_extra_fields.fields import Base64ImageField
 
 from rest_framework import serializers
 
+from recipes.images import schedule_recipe_image
+from recipes.memberships import FAVORITES, SHOPPING_CART, membership_cache
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -18,7 +20,12 @@ from recipes.models import (
 
 from users.models import Subscription, User
 
-from .utils import create_ingredients, get_tags
+from .fields import (
+    Base64RawImageField,
+    BulkPrimaryKeyRelatedField,
+    BulkRelatedListSerializer,
+)
+from .utils import update_ingredients, update_tags
 from .validators import (
     validate_email,
     validate_favorite_recipe,
@@ -70,6 +77,9 @@ class UserSerializer(UserCreateSerializer):
             bool: True, если пользователь подписан на других пользователей,
             иначе False.
         """
+        if hasattr(user, "is_subscribed"):
+            return user.is_subscribed
+
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             return Subscription.objects.filter(
@@ -107,7 +117,7 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
 
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = User
@@ -126,13 +136,24 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
         """
         Получает информацию о рецептах, созданных пользователем.
 
+        Если рецепты были заранее подгружены во вьюсете (атрибут
+        limited_recipes), дополнительный запрос не выполняется.
+        Количество рецептов ограничивается параметром recipes_limit
+        из контекста сериализатора.
+
         Args:
             user (User): Объект пользователя.
 
         Returns:
             list: Список словарей с данными о рецептах.
         """
-        recipes = Recipe.objects.filter(author=user)
+        if hasattr(user, "limited_recipes"):
+            recipes = user.limited_recipes
+        else:
+            recipes = Recipe.objects.filter(author=user)
+            recipes_limit = self.context.get("recipes_limit")
+            if recipes_limit:
+                recipes = recipes[:recipes_limit]
         recipes_data = []
         for recipe in recipes:
             recipes_data.append(
@@ -145,18 +166,6 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
             )
         return recipes_data
 
-    def get_recipes_count(self, user):
-        """
-        Получает количество рецептов, созданных пользователем.
-
-        Args:
-            user (User): Объект пользователя.
-
-        Returns:
-            int: Количество созданных рецептов.
-        """
-        return Recipe.objects.filter(author=user).count()
-
     def get_is_subscribed(self, user):
         """
         Получает информацию о подписке пользователя на других пользователей.
@@ -168,6 +177,9 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
             bool: True, если пользователь подписан на других пользователей,
             иначе False.
         """
+        if hasattr(user, "is_subscribed"):
+            return user.is_subscribed
+
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             return Subscription.objects.filter(
@@ -259,7 +271,7 @@ class IngredientToRecipeSerializer(serializers.ModelSerializer):
     - amount (int): Количество ингредиента, используемого в рецепте.
     """
 
-    id = serializers.PrimaryKeyRelatedField(
+    id = BulkPrimaryKeyRelatedField(
         queryset=Ingredient.objects.all(),
     )
 
@@ -269,16 +281,49 @@ class IngredientToRecipeSerializer(serializers.ModelSerializer):
             "id",
             "amount",
         )
+        list_serializer_class = BulkRelatedListSerializer
+
+
+class ReadIngredientToRecipeSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для чтения ингредиентов рецепта вместе с количеством.
+    """
+
+    id = serializers.ReadOnlyField(source="ingredient.id")
+    name = serializers.ReadOnlyField(source="ingredient.name")
+    measurement_unit = serializers.ReadOnlyField(
+        source="ingredient.measurement_unit"
+    )
+
+    class Meta:
+        model = RecipeIngredient
+        fields = (
+            "id",
+            "name",
+            "measurement_unit",
+            "amount",
+        )
 
 
 class ReadRecipeSerializer(serializers.ModelSerializer):
-    """Сериализатор для чтения данных о рецепте."""
+    """
+    Сериализатор для чтения данных о рецепте.
+
+    Ожидает queryset, подготовленный через Recipe.objects.with_related()
+    и with_user_annotations(). Флаги is_favorited и is_in_shopping_cart
+    проверяются по множествам рецептов пользователя, которые загружаются
+    один раз на запрос и сохраняются в контексте сериализатора.
+    """
 
     author = UserSerializer(read_only=True)
     image = Base64ImageField()
     tags = TagSerializer(many=True, read_only=True)
 
-    ingredients = serializers.SerializerMethodField()
+    ingredients = ReadIngredientToRecipeSerializer(
+        source="recipe_ingredients",
+        many=True,
+        read_only=True,
+    )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
 
@@ -293,33 +338,26 @@ class ReadRecipeSerializer(serializers.ModelSerializer):
             "is_in_shopping_cart",
             "name",
             "image",
+            "image_status",
             "text",
             "cooking_time",
         ]
 
-    def get_ingredients(self, recipe):
-        ingredient = recipe.ingredients.values(
-            "id",
-            "name",
-            "measurement_unit",
-            amount=F("recipeingredient__amount"),
-        )
-
-        return ingredient
+    def get_memberships(self):
+        """Возвращает множества рецептов текущего пользователя."""
+        memberships = self.context.get("recipe_memberships")
+        if memberships is None:
+            request = self.context.get("request")
+            user = request.user if request else AnonymousUser()
+            memberships = membership_cache.get(user)
+            self.context["recipe_memberships"] = memberships
+        return memberships
 
-    def get_is_favorited(self, instance):
-        user = self.context.get("request").user
-        if user.is_authenticated:
-            return instance.favorites.filter(
-                user=user, recipe=instance
-            ).exists()
-        return False
+    def get_is_favorited(self, recipe):
+        return recipe.id in self.get_memberships()[FAVORITES]
 
-    def get_is_in_shopping_cart(self, instance):
-        user = self.context.get("request").user
-        if user.is_anonymous:
-            return False
-        return user.shoppingcarts.filter(recipe=instance).exists()
+    def get_is_in_shopping_cart(self, recipe):
+        return recipe.id in self.get_memberships()[SHOPPING_CART]
 
 
 class CreateRecipeSerializer(serializers.ModelSerializer):
@@ -328,11 +366,11 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
     ingredients = IngredientToRecipeSerializer(
         many=True,
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = BulkPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all(),
     )
-    image = Base64ImageField()
+    image = Base64RawImageField()
 
     class Meta:
         model = Recipe
@@ -355,6 +393,9 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         """
         Создает новый рецепт в базе данных.
 
+        Картинка сохраняется как есть, а ее проверка и перекодирование
+        выполняются в фоне после фиксации транзакции.
+
         Args:
             validated_data (dict): Проверенные данные для создания рецепта.
 
@@ -363,10 +404,14 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         """
         tags_data = validated_data.pop("tags")
         ingredients_data = validated_data.pop("ingredients")
-        recipe = Recipe.objects.create(**validated_data)
+        recipe = Recipe.objects.create(
+            image_status=Recipe.IMAGE_PENDING,
+            **validated_data,
+        )
 
-        get_tags(self, tags_data, recipe)
-        create_ingredients(self, ingredients_data, recipe)
+        update_tags(recipe, tags_data)
+        update_ingredients(recipe, ingredients_data, created=True)
+        schedule_recipe_image(recipe)
 
         return recipe
 
@@ -375,6 +420,10 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         """
         Обновляет существующий рецепт.
 
+        Теги и ингредиенты сравниваются с текущими, и в базу данных
+        записываются только изменившиеся строки. Если поле не передано,
+        связи остаются без изменений.
+
         Args:
             instance (Recipe): Существующий рецепт для обновления.
             validated_data (dict): Проверенные данные для обновления рецепта.
@@ -382,18 +431,30 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         Returns:
             Recipe: Обновленный рецепт.
         """
-        tags_data = validated_data.pop("tags")
-        ingredients_data = validated_data.pop("ingredients")
+        tags_data = validated_data.pop("tags", None)
+        ingredients_data = validated_data.pop("ingredients", None)
+
+        if tags_data is not None:
+            update_tags(instance, tags_data)
+        if ingredients_data is not None:
+            update_ingredients(instance, ingredients_data)
 
-        get_tags(self, tags_data, instance)
-        create_ingredients(self, ingredients_data, instance)
+        if "image" in validated_data:
+            validated_data["image_status"] = Recipe.IMAGE_PENDING
+            schedule_recipe_image(instance)
 
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
+        request = self.context.get("request")
+        instance = (
+            Recipe.objects.with_related()
+            .with_user_annotations(request.user)
+            .get(pk=instance.pk)
+        )
         return ReadRecipeSerializer(
             instance,
-            context={"request": self.context.get("request")},
+            context={"request": request},
         ).data
 
 
@@ -410,6 +471,22 @@ class ShortRecipeSerializer(serializers.ModelSerializer):
         model = Recipe
 
 
+class BulkRecipeIdsSerializer(serializers.Serializer):
+    """Список id рецептов для массового добавления или удаления."""
+
+    MAX_RECIPES = 100
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_RECIPES,
+    )
+
+    def validate_recipes(self, value):
+        """Убирает повторы, сохраняя порядок."""
+        return list(dict.fromkeys(value))
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
     """Серилизатор для избранных рецептов."""
 
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import include, path
 
 from rest_framework import routers
@@ -20,7 +21,34 @@ router_v1.register("ingredients", IngredientViewSet, "ingredients")
 router_v1.register("recipes", RecipeViewSet, "recipes")
 
 
-urlpatterns = (
+urlpatterns = [
     path("", include(router_v1.urls)),
     path("auth/", include("djoser.urls.authtoken")),
-)
+]
+
+if settings.ASYNC_READ_VIEWS:
+    from api import async_views
+
+    # Асинхронные представления перекрывают маршруты роутера для тех же
+    # адресов и обслуживают только GET и HEAD. Запись рецептов и действия
+    # вроде favorite и download_shopping_cart остаются синхронными.
+    urlpatterns = [
+        path("recipes/", async_views.recipe_list, name="recipes-list"),
+        path(
+            "recipes/<int:pk>/",
+            async_views.recipe_detail,
+            name="recipes-detail",
+        ),
+        path("tags/", async_views.tag_list, name="tags-list"),
+        path("tags/<int:pk>/", async_views.tag_detail, name="tags-detail"),
+        path(
+            "ingredients/",
+            async_views.ingredient_list,
+            name="ingredients-list",
+        ),
+        path(
+            "ingredients/<int:pk>/",
+            async_views.ingredient_detail,
+            name="ingredients-detail",
+        ),
+    ] + urlpatterns
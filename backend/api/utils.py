@@ -1,125 +1,249 @@
-import os
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Sum
+from django.http import StreamingHttpResponse
 
-from django.http import HttpResponse
-
-from rest_framework import serializers
-
-from recipes.models import RecipeIngredient, Tag
+from recipes.counters import recount_recipe_counters
+from recipes.memberships import membership_cache
+from recipes.models import Recipe, RecipeIngredient
+from recipes.units import normalize_shopping_list
 
 from tabulate import tabulate
 
 
-def get_tags(self, tags_data, obj):
+def update_tags(recipe, tags):
     """
-    Устанавливает теги для объекта на основе предоставленных данных.
+    Приводит теги рецепта к переданному набору.
 
-    Args:
-        self: Экземпляр сериализатора.
-        tags_data (list): Список объектов тегов или их идентификаторов.
-        obj: Объект, для которого устанавливаются теги (например, рецепт).
+    Теги уже проверены сериализатором, поэтому повторно из базы данных не
+    загружаются. RelatedManager.set() сравнивает набор с текущими связями и
+    удаляет или добавляет только отличающиеся строки.
 
-    Raises:
-        serializers.ValidationError: Если один из тегов не найден в БД.
+    Args:
+        recipe (Recipe): Рецепт, для которого устанавливаются теги.
+        tags (list): Список объектов Tag.
 
     Returns:
         None
     """
-    tags = []
-    for tag in tags_data:
-        try:
-            tag = Tag.objects.get(id=tag.id)
-            tags.append(tag)
-        except Tag.DoesNotExist:
-            raise serializers.ValidationError({"error": "Тег не найден."})
-
-    obj.tags.clear()
-    obj.tags.set(tags)
+    recipe.tags.set(tags)
 
 
-def create_ingredients(self, ingredients_data, instance):
+def merge_ingredients(ingredients_data):
     """
-    Создает и связывает ингредиенты с объектом
-    на основе предоставленных данных.
+    Объединяет повторяющиеся ингредиенты, суммируя их количество.
 
     Args:
-        self: Экземпляр сериализатора.
-        ingredients_data (list): Список данных об ингредиентах,
-                                 включая их идентификаторы и количество.
-        instance: Объект, с которым связываются ингредиенты (рецепт).
-
-    Raises:
-        serializers.ValidationError: Если один из ингредиентов не найден в БД.
+        ingredients_data (list): Список словарей с ключами id (Ingredient)
+                                 и amount.
 
     Returns:
-        None
+        dict: Количество по идентификатору ингредиента в порядке первого
+              упоминания.
+    """
+    amounts = {}
+    for ingredient_data in ingredients_data:
+        ingredient_id = ingredient_data["id"].id
+        amounts[ingredient_id] = (
+            amounts.get(ingredient_id, 0) + ingredient_data["amount"]
+        )
+    return amounts
+
+
+def update_ingredients(recipe, ingredients_data, created=False):
     """
-    instance.recipe_ingredients.all().delete()
+    Синхронизирует ингредиенты рецепта с переданными данными.
 
-    ingredients = []
+    Текущие строки RecipeIngredient сравниваются с новыми: отсутствующие
+    добавляются через bulk_create, строки с изменившимся количеством
+    обновляются через bulk_update, лишние удаляются одним запросом.
+    Неизменившиеся строки не перезаписываются.
 
-    for ingredient_data in ingredients_data:
-        ingredient_id = ingredient_data["id"]
-        amount = ingredient_data["amount"]
+    Args:
+        recipe (Recipe): Рецепт, с которым связываются ингредиенты.
+        ingredients_data (list): Список словарей с ключами id и amount.
+        created (bool): Рецепт только что создан и строк у него еще нет.
 
-        try:
-            existing_ingredient = next(
-                (i for i in ingredients if i.ingredient == ingredient_id), None
-            )
+    Returns:
+        dict: Количество добавленных, обновленных и удаленных строк.
+    """
+    amounts = merge_ingredients(ingredients_data)
+    existing = (
+        {} if created else
+        {row.ingredient_id: row for row in recipe.recipe_ingredients.all()}
+    )
 
-            if existing_ingredient:
-                existing_ingredient.amount += amount
-
-            else:
-                ingredients.append(
-                    RecipeIngredient(
-                        ingredient=ingredient_id,
-                        amount=amount,
-                        recipe=instance,
-                    )
-                )
-
-        except Exception:
-            raise serializers.ValidationError(
-                {"error": "Ингредиент не найден."}
+    to_create = [
+        RecipeIngredient(
+            recipe=recipe, ingredient_id=ingredient_id, amount=amount
+        )
+        for ingredient_id, amount in amounts.items()
+        if ingredient_id not in existing
+    ]
+    to_update = []
+    for ingredient_id, row in existing.items():
+        amount = amounts.get(ingredient_id)
+        if amount is not None and row.amount != amount:
+            row.amount = amount
+            to_update.append(row)
+    to_delete = [
+        row.pk
+        for ingredient_id, row in existing.items()
+        if ingredient_id not in amounts
+    ]
+
+    if to_delete:
+        RecipeIngredient.objects.filter(pk__in=to_delete).delete()
+    if to_update:
+        RecipeIngredient.objects.bulk_update(to_update, ["amount"])
+    if to_create:
+        RecipeIngredient.objects.bulk_create(to_create)
+
+    return {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+    }
+
+
+BULK_ADDED = "added"
+BULK_ALREADY_ADDED = "already_added"
+BULK_REMOVED = "removed"
+BULK_NOT_ADDED = "not_added"
+BULK_NOT_FOUND = "not_found"
+
+
+def get_recipe_memberships(model, user, recipe_ids):
+    """
+    Одним запросом проверяет существование рецептов и их наличие в
+    избранном или корзине (model) пользователя.
+
+    Returns:
+        dict: Для каждого существующего рецепта - True, если он уже
+              добавлен пользователем.
+    """
+    return dict(
+        Recipe.objects.filter(pk__in=recipe_ids)
+        .annotate(
+            member=Exists(
+                model.objects.filter(user=user, recipe=OuterRef("pk"))
             )
+        )
+        .values_list("pk", "member")
+    )
 
-    RecipeIngredient.objects.bulk_create(ingredients)
 
+def after_bulk_change(user, recipe_ids):
+    """
+    Пересчитывает счетчики рецептов и сбрасывает множества пользователя
+    после массового изменения: bulk_create не отправляет сигналы для
+    каждой строки, а пересчет дает точные значения и после удаления.
+    """
+    recount_recipe_counters(Recipe.objects.filter(pk__in=recipe_ids))
+    transaction.on_commit(lambda: membership_cache.invalidate(user.pk))
 
-def get_shopping_cart_ingredients(user):
+
+@transaction.atomic
+def bulk_add_recipes(model, user, recipe_ids):
     """
-    Получает данные об ингредиентах для списка покупок пользователя.
+    Добавляет рецепты в избранное или корзину (model) пользователя.
 
     Args:
-        user: Пользователь, для которого получаются ингредиенты.
+        model: Favorite или ShoppingCart.
+        user (User): Пользователь.
+        recipe_ids (list): Идентификаторы рецептов.
 
     Returns:
-        dict: Словарь данных об ингредиентах, включая их наименование,
-              единицу измерения и количество.
-              Ключами словаря являются наименования ингредиентов.
+        dict: Результат для каждого id: added, already_added или
+              not_found.
     """
-    recipe_ingredients = RecipeIngredient.objects.filter(
-        recipe__shoppingcarts__user=user
-    )
+    memberships = get_recipe_memberships(model, user, recipe_ids)
+    new_ids = [pk for pk, member in memberships.items() if not member]
+    if new_ids:
+        model.objects.bulk_create(
+            [model(user=user, recipe_id=pk) for pk in new_ids],
+            ignore_conflicts=True,
+        )
+        after_bulk_change(user, new_ids)
+
+    return {
+        pk: (
+            BULK_NOT_FOUND if pk not in memberships
+            else BULK_ALREADY_ADDED if memberships[pk]
+            else BULK_ADDED
+        )
+        for pk in recipe_ids
+    }
 
-    ingredients_data = {}
 
-    for recipe_ingredient in recipe_ingredients:
-        ingredient_name = recipe_ingredient.ingredient.name
-        ingredient_measurement_unit = (
-            recipe_ingredient.ingredient.measurement_unit
+@transaction.atomic
+def bulk_remove_recipes(model, user, recipe_ids):
+    """
+    Удаляет рецепты из избранного или корзины (model) пользователя.
+
+    Returns:
+        dict: Результат для каждого id: removed, not_added или not_found.
+    """
+    memberships = get_recipe_memberships(model, user, recipe_ids)
+    removed_ids = [pk for pk, member in memberships.items() if member]
+    if removed_ids:
+        model.objects.filter(user=user, recipe_id__in=removed_ids).delete()
+        after_bulk_change(user, removed_ids)
+
+    return {
+        pk: (
+            BULK_NOT_FOUND if pk not in memberships
+            else BULK_REMOVED if memberships[pk]
+            else BULK_NOT_ADDED
         )
-        ingredient_amount = recipe_ingredient.amount
+        for pk in recipe_ids
+    }
+
+
+def get_recipes_limit(request):
+    """
+    Получает ограничение количества рецептов из параметра recipes_limit.
+
+    Args:
+        request: HTTP-запрос.
 
-        if ingredient_name in ingredients_data:
-            ingredients_data[ingredient_name]["amount"] += ingredient_amount
-        else:
-            ingredients_data[ingredient_name] = {
-                "measurement_unit": ingredient_measurement_unit,
-                "amount": ingredient_amount,
-            }
+    Returns:
+        int | None: Положительное число рецептов или None, если параметр
+                    не передан или передан некорректно.
+    """
+    try:
+        recipes_limit = int(request.query_params.get("recipes_limit"))
+    except (TypeError, ValueError):
+        return None
+    return recipes_limit if recipes_limit > 0 else None
 
-    return ingredients_data
+
+def get_shopping_cart_ingredients(user):
+    """
+    Получает данные об ингредиентах для списка покупок пользователя.
+
+    Суммирование выполняется одним запросом в базе данных с группировкой
+    по наименованию и единице измерения. Затем строки одного ингредиента
+    сводятся за один проход: переводимые единицы (кг, л, ложки, стакан)
+    приводятся к г или мл, объем переводится в массу по известной
+    плотности, и для каждой строки выбирается единица вывода.
+
+    Args:
+        user: Пользователь, для которого получаются ингредиенты.
+
+    Returns:
+        Iterator[dict]: Словари с ключами name, measurement_unit и
+                        amount, упорядоченные по наименованию ингредиента.
+    """
+    rows = (
+        RecipeIngredient.objects.filter(recipe__shoppingcarts__user=user)
+        .values(
+            name=F("ingredient__name"),
+            measurement_unit=F("ingredient__measurement_unit"),
+        )
+        .annotate(amount=Sum("amount"))
+        .order_by("name", "measurement_unit")
+    )
+    return normalize_shopping_list(rows.iterator())
 
 
 def generate_shopping_cart_txt(ingredients_data):
@@ -128,19 +252,21 @@ def generate_shopping_cart_txt(ingredients_data):
     на основе данных об ингредиентах.
 
     Args:
-        ingredients_data (dict): Словарь данных об ингредиентах,
+        ingredients_data (Iterable[dict]): Данные об ингредиентах,
         включая их наименование, единицу измерения и количество.
 
     Returns:
         str: Текстовое представление списка покупок.
     """
     headers = ["Ингредиент", "Единицы измерения", "Количество"]
-    rows = []
-
-    for ingredient_name, ingredient_info in ingredients_data.items():
-        measurement_unit = ingredient_info["measurement_unit"]
-        amount = ingredient_info["amount"]
-        rows.append([ingredient_name, measurement_unit, amount])
+    rows = [
+        [
+            ingredient["name"],
+            ingredient["measurement_unit"],
+            ingredient["amount"],
+        ]
+        for ingredient in ingredients_data
+    ]
 
     # Используем tabulate для форматирования таблицы
     txt_content = tabulate(rows, headers, tablefmt="grid")
@@ -148,20 +274,29 @@ def generate_shopping_cart_txt(ingredients_data):
     return f"Список покупок:\n\n{txt_content}\n"
 
 
-def send_shopping_cart_txt(txt_content):
-    """Отправляет текстовый файл списка покупок в HTTP-ответе."""
-    temp_file_path = "temp_shopping_cart.txt"
+def send_shopping_cart(ingredients_data, renderer):
+    """
+    Отправляет файл списка покупок в HTTP-ответе.
 
-    try:
-        with open(temp_file_path, "w", encoding="utf-8") as txt_file:
-            txt_file.write(txt_content)
-
-        with open(temp_file_path, "rb") as txt_file:
-            response = HttpResponse(txt_file.read(), content_type="text/plain")
-            response[
-                "Content-Disposition"
-            ] = f'attachment; filename="{os.path.basename(temp_file_path)}"'
-
-        return response
-    finally:
-        os.remove(temp_file_path)
+    Содержимое формируется рендерером и передается из памяти по частям,
+    без создания временного файла на диске.
+
+    Args:
+        ingredients_data (Iterable[dict]): Данные об ингредиентах.
+        renderer (ShoppingCartRenderer): Рендерер выбранного формата.
+
+    Returns:
+        StreamingHttpResponse: Ответ с файлом списка покупок.
+    """
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type = f"{content_type}; charset={renderer.charset}"
+
+    response = StreamingHttpResponse(
+        renderer.stream(ingredients_data),
+        content_type=content_type,
+    )
+    response[
+        "Content-Disposition"
+    ] = f'attachment; filename="{renderer.get_filename()}"'
+    return response
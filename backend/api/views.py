@@ -1,3 +1,4 @@
+from django.db.models import Exists, OuterRef, Prefetch, Value
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 
@@ -5,8 +6,8 @@ from djoser.views import UserViewSet as DjoserUserViewSet
 
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import (
+    IsAdminUser,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
@@ -14,6 +15,7 @@ from rest_framework.response import Response
 
 from recipes.models import (
     Favorite,
+    FeedEntry,
     Ingredient,
     Recipe,
     ShoppingCart,
@@ -22,7 +24,20 @@ from recipes.models import (
 from users.models import Subscription, User
 
 from .filter import IngredientFilter, RecipeFilter
+from .mixins import (
+    RESPONSE_CACHE_STATS,
+    AnonymousRecipeCacheMixin,
+    CatalogCacheMixin,
+    ReplicaReadMixin,
+)
+from .pagination import (
+    FeedPagination,
+    LimitPageNumberPagination,
+    RecipePagination,
+)
+from .renderers import SHOPPING_CART_RENDERERS
 from .serializers import (
+    BulkRecipeIdsSerializer,
     CreateRecipeSerializer,
     FavoriteSerializer,
     IngredientSerializer,
@@ -34,19 +49,43 @@ from .serializers import (
     UserSubscribeSerializer,
 )
 from .utils import (
-    generate_shopping_cart_txt,
+    bulk_add_recipes,
+    bulk_remove_recipes,
+    get_recipes_limit,
     get_shopping_cart_ingredients,
-    send_shopping_cart_txt,
+    send_shopping_cart,
 )
 
 
-class PublicUserViewSet(DjoserUserViewSet):
+class PublicUserViewSet(ReplicaReadMixin, DjoserUserViewSet):
     """Представление для работы с публичными данными пользователей."""
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = LimitPageNumberPagination
     permission_classes = [IsAuthenticated]
+    replica_read_actions = ("list", "retrieve", "subscriptions")
+
+    def get_queryset(self):
+        """
+        Для списка и профиля пользователя добавляет флаг is_subscribed
+        аннотацией, чтобы не выполнять отдельный запрос на каждого
+        пользователя.
+        """
+        queryset = super().get_queryset()
+        if self.action not in ("list", "retrieve"):
+            return queryset
+
+        user = self.request.user
+        if user.is_anonymous:
+            is_subscribed = Value(False)
+        else:
+            is_subscribed = Exists(
+                Subscription.objects.filter(
+                    author=OuterRef("pk"), follower=user
+                )
+            )
+        return queryset.annotate(is_subscribed=is_subscribed).order_by("id")
 
     @action(
         detail=False,
@@ -55,10 +94,36 @@ class PublicUserViewSet(DjoserUserViewSet):
         permission_classes=[IsAuthenticated],
     )
     def subscriptions(self, request):
-        subscribed_to = self.paginate_queryset(
+        """
+        Возвращает авторов, на которых подписан пользователь.
+
+        Рецепты авторов подгружаются одним запросом и ограничиваются
+        параметром recipes_limit на стороне базы данных, а количество
+        рецептов берется из поля recipes_count.
+        """
+        recipes_limit = get_recipes_limit(request)
+        recipes = Recipe.objects.order_by("-pub_date", "-id")
+        if recipes_limit:
+            recipes = recipes.limit_per_author(recipes_limit)
+
+        queryset = (
             User.objects.filter(author__follower=request.user)
+            .annotate(is_subscribed=Value(True))
+            .prefetch_related(
+                Prefetch(
+                    "recipes",
+                    queryset=recipes,
+                    to_attr="limited_recipes",
+                )
+            )
+            .order_by("id")
+        )
+        subscribed_to = self.paginate_queryset(queryset)
+        serializer = UserSubscriptionSerializer(
+            subscribed_to,
+            many=True,
+            context={"request": request, "recipes_limit": recipes_limit},
         )
-        serializer = UserSubscriptionSerializer(subscribed_to, many=True)
         return self.get_paginated_response(serializer.data)
 
     @action(
@@ -73,7 +138,10 @@ class PublicUserViewSet(DjoserUserViewSet):
         serializer = UserSubscribeSerializer(
             author,
             data=request.data,
-            context={"request": request},
+            context={
+                "request": request,
+                "recipes_limit": get_recipes_limit(request),
+            },
         )
         serializer.is_valid(raise_exception=True)
 
@@ -103,7 +171,9 @@ class PublicUserViewSet(DjoserUserViewSet):
         return Response(message, status=status.HTTP_204_NO_CONTENT)
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(
+    ReplicaReadMixin, CatalogCacheMixin, viewsets.ReadOnlyModelViewSet
+):
     """
     Представление для работы с тегами рецептов.
 
@@ -118,7 +188,9 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(
+    ReplicaReadMixin, CatalogCacheMixin, viewsets.ReadOnlyModelViewSet
+):
     """
     Представление для работы с ингредиентами.
     """
@@ -132,11 +204,28 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ReplicaReadMixin, AnonymousRecipeCacheMixin, viewsets.ModelViewSet
+):
     queryset = Recipe.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    pagination_class = RecipePagination
+
+    def get_queryset(self):
+        """
+        Для чтения возвращает рецепты с подгруженными связями и
+        аннотациями текущего пользователя, чтобы число запросов
+        не зависело от размера страницы.
+        """
+        if self.request.method == "GET":
+            return (
+                Recipe.objects.defer("search_vector")
+                .with_related()
+                .with_user_annotations(self.request.user)
+            )
+        return super().get_queryset()
 
     def get_serializer_class(self):
         if self.request.method == "GET":
@@ -214,13 +303,139 @@ class RecipeViewSet(viewsets.ModelViewSet):
         detail=False,
         methods=["get"],
         permission_classes=[IsAuthenticated],
+        pagination_class=FeedPagination,
+    )
+    def feed(self, request):
+        """
+        Лента рецептов авторов, на которых подписан пользователь.
+
+        Страница выбирается из таблицы ленты одним диапазоном индекса,
+        затем рецепты страницы загружаются по первичным ключам.
+        """
+        entries = FeedEntry.objects.filter(follower=request.user).order_by(
+            "-pub_date", "-recipe_id"
+        )
+        page = self.paginate_queryset(entries.only("recipe_id", "pub_date"))
+        recipe_ids = [entry.recipe_id for entry in page]
+        recipes = (
+            Recipe.objects.defer("search_vector")
+            .with_related()
+            .with_user_annotations(request.user)
+            .in_bulk(recipe_ids)
+        )
+        serializer = ReadRecipeSerializer(
+            [recipes[pk] for pk in recipe_ids if pk in recipes],
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"], pagination_class=None)
+    def similar(self, request, pk):
+        """
+        Рецепты, похожие на данный по составу ингредиентов.
+
+        Соседи заранее рассчитаны командой build_similar_recipes, поэтому
+        ответ читается по индексу (recipe, rank) без расчета сходства.
+        Количество ограничивается параметром recipes_limit.
+        """
+        recipes = (
+            self.get_queryset()
+            .filter(similar_to__recipe_id=pk)
+            .order_by("similar_to__rank")
+        )
+        recipes_limit = get_recipes_limit(request)
+        if recipes_limit:
+            recipes = recipes[:recipes_limit]
+        recipes = list(recipes)
+        if not recipes:
+            get_object_or_404(Recipe, id=pk)
+
+        serializer = self.get_serializer(recipes, many=True)
+        return Response(serializer.data)
+
+    def bulk_change(self, request, model):
+        """
+        Добавляет (POST) или удаляет (DELETE) список рецептов из
+        избранного или корзины и возвращает результат по каждому id.
+        """
+        serializer = BulkRecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data["recipes"]
+
+        if request.method == "POST":
+            outcomes = bulk_add_recipes(model, request.user, recipe_ids)
+        else:
+            outcomes = bulk_remove_recipes(model, request.user, recipe_ids)
+        return Response(
+            {
+                "results": [
+                    {"id": pk, "status": outcome}
+                    for pk, outcome in outcomes.items()
+                ]
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        permission_classes=[IsAuthenticated],
+        url_path="favorite",
+    )
+    def bulk_favorite(self, request):
+        return self.bulk_change(request, Favorite)
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        permission_classes=[IsAuthenticated],
+        url_path="shopping_cart",
+    )
+    def bulk_shopping_cart(self, request):
+        return self.bulk_change(request, ShoppingCart)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAuthenticated],
+        renderer_classes=SHOPPING_CART_RENDERERS,
     )
     def download_shopping_cart(self, request):
-        """Отправляет текстовый файл списка покупок."""
+        """
+        Отправляет файл списка покупок.
+
+        Формат выбирается параметром format (txt, csv, json, pdf)
+        или заголовком Accept (text/plain, text/csv, application/x-ndjson,
+        application/pdf); по умолчанию - текстовая таблица. Формат json -
+        это JSON Lines, по объекту ингредиента на строку.
+
+        Строки списка читаются из базы здесь, в потоке представления:
+        под ASGI потоковый ответ отдается из цикла событий, где запросы
+        к базе данных запрещены. Строк не больше, чем разных
+        ингредиентов в корзине.
+        """
 
         user = request.user
-        ingredients_data = get_shopping_cart_ingredients(user)
-        txt_content = generate_shopping_cart_txt(ingredients_data)
-        response = send_shopping_cart_txt(txt_content)
+        ingredients_data = list(get_shopping_cart_ingredients(user))
+        response = send_shopping_cart(
+            ingredients_data, request.accepted_renderer
+        )
 
         return response
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAdminUser],
+    )
+    def cache_stats(self, request):
+        """
+        Возвращает статистику попаданий в кэши ответов текущего процесса.
+        """
+        return Response(
+            {
+                prefix: stats.as_dict()
+                for prefix, stats in RESPONSE_CACHE_STATS.items()
+            }
+        )
@@ -0,0 +1,67 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def get_pin_key(user_id):
+    return f"db_primary_pin:{user_id}"
+
+
+def pin_to_primary(user):
+    """
+    Направляет чтения пользователя в основную базу на
+    REPLICA_PIN_SECONDS секунд после его записи, чтобы он видел свои
+    изменения независимо от отставания реплик.
+    """
+    if settings.DATABASE_REPLICAS and user.is_authenticated:
+        cache.set(get_pin_key(user.pk), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    return user.is_authenticated and bool(cache.get(get_pin_key(user.pk)))
+
+
+def use_replica(enabled):
+    """
+    Включает или выключает чтение с реплик в текущем контексте.
+
+    Returns:
+        contextvars.Token: Токен для восстановления прежнего значения.
+    """
+    return _use_replica.set(enabled)
+
+
+def reset_replica(token):
+    _use_replica.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Маршрутизатор запросов между основной базой и репликами для чтения.
+
+    Чтения уходят на случайную реплику из DATABASE_REPLICAS, только если
+    это разрешено в текущем контексте (см. api.mixins.ReplicaReadMixin);
+    все остальные запросы и все записи выполняются в основной базе.
+    Для локальной проверки достаточно двух баз SQLite:
+
+        DATABASES["replica_1"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "replica.sqlite3",
+        }
+        DATABASE_REPLICAS = ["replica_1"]
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and _use_replica.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
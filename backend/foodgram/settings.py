@@ -39,8 +39,23 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.middleware.QueryInstrumentationMiddleware",
 ]
 
+# Значения переменных окружения, включающие флаги ниже; "0" и "False"
+# их выключают.
+TRUE_VALUES = ("1", "true", "True")
+
+QUERY_INSTRUMENTATION = (
+    os.getenv("QUERY_INSTRUMENTATION", str(DEBUG)) in TRUE_VALUES
+)
+
+# Асинхронные представления чтения рецептов, тегов и ингредиентов.
+# Включаются в foodgram/asgi.py; под WSGI они только добавили бы
+# накладные расходы на переключение между потоками.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "") in TRUE_VALUES
+ASYNC_READ_THREADS = int(os.getenv("ASYNC_READ_THREADS", 32))
+
 AUTH_USER_MODEL = "users.User"
 
 ROOT_URLCONF = "foodgram.urls"
@@ -64,9 +79,11 @@ TEMPLATES = [
 WSGI_APPLICATION = "foodgram.wsgi.application"
 
 
+# DB_ENGINE позволяет запустить проект и тесты на SQLite
+# (django.db.backends.sqlite3) без сервера PostgreSQL.
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": os.getenv("DB_ENGINE", "django.db.backends.postgresql"),
         "NAME": os.getenv("POSTGRES_DB", "django"),
         "USER": os.getenv("POSTGRES_USER", "django"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
@@ -75,6 +92,48 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения задаются списком хостов через запятую и используют
+# те же имя базы и учетные данные, что и основная база.
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["foodgram.routers.ReadReplicaRouter"]
+
+# Сколько секунд после записи чтения пользователя идут в основную базу.
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "/tmp/foodgram_cache"),
+    }
+}
+
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+RECIPE_CACHE_TIMEOUT = int(os.getenv("RECIPE_CACHE_TIMEOUT", 60 * 5))
+
+FEED_BACKFILL_LIMIT = int(os.getenv("FEED_BACKFILL_LIMIT", 500))
+
+SIMILAR_RECIPES_TOP_K = int(os.getenv("SIMILAR_RECIPES_TOP_K", 20))
+
+RECIPE_MEMBERSHIP_CACHE_SIZE = int(
+    os.getenv("RECIPE_MEMBERSHIP_CACHE_SIZE", 1000)
+)
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -99,12 +158,28 @@ USE_TZ = True
 
 INGREDIENT_CSV_FILE_PATH = BASE_DIR / "data/"
 
+INGREDIENT_INDEX_TTL = int(os.getenv("INGREDIENT_INDEX_TTL", 300))
+
+RECIPE_SEARCH_FALLBACK_LIMIT = int(
+    os.getenv("RECIPE_SEARCH_FALLBACK_LIMIT", 500)
+)
+
+RECIPE_COVERAGE_LIMIT = int(os.getenv("RECIPE_COVERAGE_LIMIT", 500))
+
+SHOPPING_CART_PDF_FONT = os.getenv(
+    "SHOPPING_CART_PDF_FONT",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+)
+
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "collected_static"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "/media"
 
+RECIPE_IMAGE_WORKERS = int(os.getenv("RECIPE_IMAGE_WORKERS", 2))
+RECIPE_IMAGE_MAX_SIZE = 1920
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
@@ -112,7 +187,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.LimitPageNumberPagination",
     "PAGE_SIZE": 6,
 }
 
@@ -0,0 +1,21 @@
+"""
+Конфигурация gunicorn для запуска ASGI-приложения воркерами uvicorn:
+
+    gunicorn -c gunicorn_asgi.conf.py
+
+Один воркер обслуживает тысячи соединений в цикле событий, а запросы к
+базе данных выполняются в пуле потоков размером ASYNC_READ_THREADS.
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = "foodgram.asgi:application"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(
+    os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
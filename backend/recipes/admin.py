@@ -11,9 +11,15 @@ from .models import (
 
 
 class IngredientInline(admin.TabularInline):
+    """
+    Ингредиенты рецепта. Ингредиент выбирается автодополнением, а не
+    списком всего каталога в каждой строке.
+    """
+
     model = RecipeIngredient
-    extra = 3
+    extra = 1
     min_num = 1
+    autocomplete_fields = ("ingredient",)
 
 
 @admin.register(Recipe)
@@ -26,13 +32,17 @@ class RecipeAdmin(admin.ModelAdmin):
         "cooking_time",
         "in_favorite",
     )
-    list_filter = ("name", "author", "tags")
-    search_fields = ("name", "author", "tags")
+    list_select_related = ("author",)
+    list_filter = ("tags",)
+    search_fields = ("name", "author__username__exact", "tags__slug__exact")
+    autocomplete_fields = ("author", "tags")
     inlines = (IngredientInline,)
+    show_full_result_count = False
     empty_value_display = "-пусто-"
 
+    @admin.display(description="В избранном", ordering="favorites_count")
     def in_favorite(self, obj: Recipe):
-        return obj.favorites.count()
+        return obj.favorites_count
 
 
 @admin.register(Ingredient)
@@ -40,8 +50,9 @@ class IngredientAdmin(admin.ModelAdmin):
     """Админ панель управление ингридиентами"""
 
     list_display = ("id", "name", "measurement_unit")
-    search_fields = ("name",)
-    list_filter = ("name",)
+    search_fields = ("^name",)
+    list_filter = ("measurement_unit",)
+    ordering = ("name",)
     empty_value_display = "-пусто-"
 
 
@@ -57,8 +68,10 @@ class FavoriteAdmin(admin.ModelAdmin):
     """Админ панель управление подписками"""
 
     list_display = ("user", "recipe")
-    list_filter = ("user", "recipe")
-    search_fields = ("user", "recipe")
+    list_select_related = ("user", "recipe")
+    search_fields = ("user__username__exact", "recipe__name")
+    autocomplete_fields = ("user", "recipe")
+    show_full_result_count = False
     empty_value_display = "-пусто-"
 
 
@@ -67,6 +80,8 @@ class ShoplistAdmin(admin.ModelAdmin):
     """Админ панель списка покупок"""
 
     list_display = ("recipe", "user")
-    list_filter = ("recipe", "user")
-    search_fields = ("user",)
+    list_select_related = ("recipe", "user")
+    search_fields = ("user__username__exact", "recipe__name")
+    autocomplete_fields = ("recipe", "user")
+    show_full_result_count = False
     empty_value_display = "-пусто-"
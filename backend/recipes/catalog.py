@@ -0,0 +1,48 @@
+import time
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "catalog_version"
+RECIPES_VERSION_KEY = "recipes_version"
+
+
+def get_version(key):
+    """
+    Возвращает текущее значение счетчика версий, хранящегося в кэше.
+
+    Если версия еще не сохранена в кэше (например, после его очистки),
+    она инициализируется текущим временем, чтобы не совпасть ни с одной
+    из ранее выданных версий.
+    """
+    cache.add(key, int(time.time() * 1000), timeout=None)
+    return cache.get(key)
+
+
+def bump_version(key):
+    """Увеличивает счетчик версий, хранящийся в кэше."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = int(time.time() * 1000)
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def get_catalog_version():
+    """Возвращает текущую версию каталога тегов и ингредиентов."""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Увеличивает версию каталога после изменения тегов или ингредиентов."""
+    return bump_version(CATALOG_VERSION_KEY)
+
+
+def get_recipes_version():
+    """Возвращает текущую версию данных рецептов для кэша ответов."""
+    return get_version(RECIPES_VERSION_KEY)
+
+
+def bump_recipes_version():
+    """Увеличивает версию данных рецептов после их изменения."""
+    return bump_version(RECIPES_VERSION_KEY)
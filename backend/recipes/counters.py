@@ -0,0 +1,61 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def change_counter(model, pk, field, delta):
+    """
+    Атомарно изменяет счетчик одной строки выражением F().
+
+    При уменьшении строка обновляется, только если счетчик больше нуля,
+    чтобы расхождение не приводило к отрицательным значениям.
+    """
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gt": 0})
+    queryset.update(**{field: F(field) + delta})
+
+
+def count_subquery(related_model, fk_name):
+    """
+    Возвращает подзапрос, считающий строки related_model, ссылающиеся
+    по полю fk_name на строку внешнего запроса.
+    """
+    return Coalesce(
+        Subquery(
+            related_model.objects.filter(**{fk_name: OuterRef("pk")})
+            .order_by()
+            .values(fk_name)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def recount_recipe_counters(queryset):
+    """
+    Пересчитывает favorites_count и shopping_cart_count рецептов
+    queryset одним UPDATE.
+
+    Returns:
+        int: Количество обновленных рецептов.
+    """
+    from .models import Favorite, ShoppingCart
+
+    return queryset.update(
+        favorites_count=count_subquery(Favorite, "recipe"),
+        shopping_cart_count=count_subquery(ShoppingCart, "recipe"),
+    )
+
+
+def recount_author_counters(queryset):
+    """
+    Пересчитывает recipes_count пользователей queryset одним UPDATE.
+
+    Returns:
+        int: Количество обновленных пользователей.
+    """
+    from .models import Recipe
+
+    return queryset.update(recipes_count=count_subquery(Recipe, "author"))
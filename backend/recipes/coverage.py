@@ -0,0 +1,172 @@
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import Case, IntegerField, Value, When
+
+from .catalog import bump_version, get_version
+
+COVERAGE_VERSION_KEY = "recipe_coverage_version"
+
+
+def load_compositions(recipe_ids=None):
+    """
+    Загружает составы рецептов.
+
+    Args:
+        recipe_ids: Рецепты, составы которых нужны. None - все рецепты.
+
+    Returns:
+        dict: Кортежи id ингредиентов по id рецептов. Рецепты без
+              ингредиентов в словарь не попадают.
+    """
+    from .models import RecipeIngredient
+
+    rows = RecipeIngredient.objects.values_list("recipe_id", "ingredient_id")
+    if recipe_ids is not None:
+        rows = rows.filter(recipe_id__in=recipe_ids)
+
+    compositions = defaultdict(set)
+    for recipe_id, ingredient_id in rows.iterator():
+        compositions[recipe_id].add(ingredient_id)
+    return {
+        recipe_id: tuple(sorted(ingredients))
+        for recipe_id, ingredients in compositions.items()
+    }
+
+
+class RecipeCoverageIndex:
+    """
+    Инвертированный индекс "ингредиент -> рецепты" в памяти процесса.
+
+    Хранит для каждого ингредиента отсортированный список рецептов, в
+    которых он используется, и состав каждого рецепта. Опубликованные
+    списки не изменяются: обновление собирает новые и подменяет их
+    целиком, поэтому запросы читают индекс без блокировки.
+
+    Актуальность индекса проверяется по версии COVERAGE_VERSION_KEY в
+    кэше Django: изменение составов увеличивает версию, и каждый процесс
+    строит индекс заново при следующем запросе. Журнал изменений по
+    версиям не ведется: cache.incr в FileBasedCache не атомарен, и два
+    процесса могут получить одну версию, а точечное обновление по такому
+    журналу навсегда потеряло бы одно из изменений. Версия читается до
+    загрузки составов, а увеличивается после фиксации изменений, поэтому
+    индекс с совпавшей версией содержит изменения обоих процессов.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+        self._version = None
+
+    def build(self, version):
+        """
+        Перестраивает индекс по текущему содержимому базы данных.
+
+        Returns:
+            tuple: Списки рецептов по ингредиентам и составы рецептов.
+        """
+        compositions = load_compositions()
+        postings = defaultdict(list)
+        for recipe_id in sorted(compositions):
+            for ingredient_id in compositions[recipe_id]:
+                postings[ingredient_id].append(recipe_id)
+
+        state = (dict(postings), compositions)
+        self._state, self._version = state, version
+        return state
+
+    def sync(self):
+        """
+        Приводит индекс к текущей версии.
+
+        Returns:
+            tuple: Списки рецептов по ингредиентам и составы рецептов.
+        """
+        version = get_version(COVERAGE_VERSION_KEY)
+        state = self._state
+        if state is not None and self._version == version:
+            return state
+
+        with self._lock:
+            if self._state is not None and self._version == version:
+                return self._state
+            return self.build(version)
+
+    def coverage(self, ingredient_ids, max_missing=0):
+        """
+        Находит рецепты, для которых недостает не более max_missing
+        ингредиентов из ingredient_ids.
+
+        Для каждого рецепта считается, сколько раз он встретился в
+        списках выбранных ингредиентов; разница с размером состава
+        равна числу недостающих ингредиентов.
+
+        Returns:
+            list: Пары (число недостающих ингредиентов, id рецепта):
+                  сначала рецепты с меньшим числом недостающих, при
+                  равенстве - более новые.
+        """
+        postings, recipes = self.sync()
+        counts = Counter()
+        for ingredient_id in set(ingredient_ids):
+            counts.update(postings.get(ingredient_id, ()))
+
+        matches = []
+        for recipe_id, count in counts.items():
+            missing = len(recipes[recipe_id]) - count
+            if missing <= max_missing:
+                matches.append((missing, -recipe_id))
+        matches.sort()
+        return [(missing, -recipe_id) for missing, recipe_id in matches]
+
+
+recipe_coverage_index = RecipeCoverageIndex()
+
+
+def invalidate_coverage():
+    """
+    Сбрасывает индексы всех процессов после изменения составов рецептов
+    или каталога ингредиентов: индекс будет построен заново.
+    """
+    bump_version(COVERAGE_VERSION_KEY)
+
+
+def filter_by_coverage(queryset, ingredient_ids, max_missing=0):
+    """
+    Оставляет рецепты, которые можно приготовить из ingredient_ids, если
+    недостает не более max_missing ингредиентов, и сортирует их по числу
+    недостающих ингредиентов, затем по дате публикации.
+
+    Число рецептов ограничено RECIPE_COVERAGE_LIMIT. Ограничение
+    применяется после остальных фильтров queryset: в результат попадают
+    первые по ранжированию рецепты, которые им удовлетворяют.
+    """
+    limit = getattr(settings, "RECIPE_COVERAGE_LIMIT", 500)
+    matches = recipe_coverage_index.coverage(ingredient_ids, max_missing)
+    if len(matches) > limit:
+        selected = set(
+            queryset.first_in_queryset(
+                [recipe_id for _, recipe_id in matches], limit
+            )
+        )
+        matches = [match for match in matches if match[1] in selected]
+    if not matches:
+        return queryset.none()
+
+    by_missing = defaultdict(list)
+    for missing, recipe_id in matches:
+        by_missing[missing].append(recipe_id)
+    return (
+        queryset.filter(pk__in=[recipe_id for _, recipe_id in matches])
+        .annotate(
+            missing_ingredients=Case(
+                *[
+                    When(pk__in=recipe_ids, then=Value(missing))
+                    for missing, recipe_ids in by_missing.items()
+                ],
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("missing_ingredients", "-pub_date", "-id")
+    )
@@ -0,0 +1,126 @@
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+
+from users.models import Subscription
+
+from .models import FeedEntry, Recipe
+
+FEED_BATCH_SIZE = 1000
+
+
+def create_entries(entries):
+    """
+    Сохраняет записи ленты пачками по FEED_BATCH_SIZE.
+
+    Args:
+        entries (Iterable[FeedEntry]): Записи ленты.
+
+    Returns:
+        int: Количество переданных записей.
+    """
+    batch, total = [], 0
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= FEED_BATCH_SIZE:
+            total += save_batch(batch)
+            batch = []
+    return total + save_batch(batch)
+
+
+def save_batch(batch):
+    FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+    return len(batch)
+
+
+def latest_recipes(author_id):
+    """
+    Возвращает не более FEED_BACKFILL_LIMIT последних рецептов автора.
+
+    Returns:
+        list: Пары (id, pub_date) рецептов.
+    """
+    return list(
+        Recipe.objects.filter(author_id=author_id)
+        .order_by("-pub_date", "-id")
+        .values_list("id", "pub_date")[: settings.FEED_BACKFILL_LIMIT]
+    )
+
+
+def fan_out_recipe(recipe):
+    """
+    Добавляет новый рецепт в ленты всех подписчиков его автора.
+
+    Выполняет одну вставку на каждые FEED_BATCH_SIZE подписчиков,
+    поэтому вызывается после фиксации транзакции, а не внутри запроса
+    на создание рецепта.
+    """
+    followers = Subscription.objects.filter(
+        author_id=recipe.author_id
+    ).values_list("follower_id", flat=True)
+    create_entries(
+        FeedEntry(
+            follower_id=follower_id,
+            author_id=recipe.author_id,
+            recipe_id=recipe.pk,
+            pub_date=recipe.pub_date,
+        )
+        for follower_id in followers.iterator()
+    )
+
+
+def backfill_subscription(follower_id, author_id):
+    """
+    Добавляет в ленту подписчика не более FEED_BACKFILL_LIMIT последних
+    рецептов автора, на которого он подписался.
+    """
+    create_entries(
+        FeedEntry(
+            follower_id=follower_id,
+            author_id=author_id,
+            recipe_id=recipe_id,
+            pub_date=pub_date,
+        )
+        for recipe_id, pub_date in latest_recipes(author_id)
+    )
+
+
+def prune_subscription(follower_id, author_id):
+    """Удаляет рецепты автора из ленты отписавшегося пользователя."""
+    FeedEntry.objects.filter(
+        follower_id=follower_id, author_id=author_id
+    ).delete()
+
+
+def rebuild_feeds():
+    """
+    Заново строит ленты всех пользователей по подпискам.
+
+    Как и при подписке, в ленту попадают не более FEED_BACKFILL_LIMIT
+    последних рецептов каждого автора. Рецепты автора загружаются один
+    раз для всех его подписчиков.
+
+    Returns:
+        int: Количество записей в лентах.
+    """
+    FeedEntry.objects.all().delete()
+    return create_entries(subscription_entries())
+
+
+def subscription_entries():
+    subscriptions = Subscription.objects.order_by("author_id").values_list(
+        "author_id", "follower_id"
+    )
+    for author_id, followers in groupby(
+        subscriptions.iterator(), key=itemgetter(0)
+    ):
+        recipes = latest_recipes(author_id)
+        for _, follower_id in followers:
+            for recipe_id, pub_date in recipes:
+                yield FeedEntry(
+                    follower_id=follower_id,
+                    author_id=author_id,
+                    recipe_id=recipe_id,
+                    pub_date=pub_date,
+                )
@@ -0,0 +1,148 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection, transaction
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Возвращает пул потоков обработки изображений текущего процесса."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.RECIPE_IMAGE_WORKERS,
+                thread_name_prefix="recipe-image",
+            )
+    return _executor
+
+
+def reencode_image(raw_file):
+    """
+    Проверяет и перекодирует изображение.
+
+    Изображение поворачивается согласно EXIF-ориентации, уменьшается до
+    RECIPE_IMAGE_MAX_SIZE по большей стороне и сохраняется заново, поэтому
+    EXIF и прочие метаданные в результат не попадают.
+
+    Returns:
+        tuple: Содержимое нового файла (bytes) и его расширение.
+
+    Raises:
+        PIL.UnidentifiedImageError, OSError: Если файл не является
+        корректным изображением.
+    """
+    with Image.open(raw_file) as image:
+        image.verify()
+
+    raw_file.seek(0)
+    with Image.open(raw_file) as image:
+        image = ImageOps.exif_transpose(image)
+        max_size = settings.RECIPE_IMAGE_MAX_SIZE
+        image.thumbnail((max_size, max_size))
+
+        buffer = io.BytesIO()
+        if image.mode in ("RGBA", "LA", "P"):
+            image.save(buffer, format="PNG", optimize=True)
+            return buffer.getvalue(), "png"
+
+        image.convert("RGB").save(
+            buffer, format="JPEG", quality=85, optimize=True
+        )
+        return buffer.getvalue(), "jpg"
+
+
+def process_recipe_image(recipe_id):
+    """
+    Обрабатывает загруженное изображение рецепта и обновляет его статус.
+
+    Функция выполняется вне HTTP-запроса: в пуле потоков или командой
+    process_recipe_images. Результат записывается, только если за время
+    обработки у рецепта не сменилось изображение; иначе он отбрасывается.
+    Запись идет через update() без post_save, поэтому кэш ответов
+    рецептов сбрасывается явно.
+    """
+    from .catalog import bump_recipes_version
+    from .models import Recipe
+
+    recipe = Recipe.objects.filter(
+        pk=recipe_id, image_status=Recipe.IMAGE_PENDING
+    ).first()
+    if recipe is None:
+        return
+
+    raw_name = recipe.image.name
+    unchanged = Recipe.objects.filter(
+        pk=recipe_id, image=raw_name, image_status=Recipe.IMAGE_PENDING
+    )
+    try:
+        with recipe.image.open("rb") as raw_file:
+            content, extension = reencode_image(raw_file)
+    except (UnidentifiedImageError, OSError, ValueError) as error:
+        logger.warning(
+            "Не удалось обработать изображение рецепта %s: %s",
+            recipe_id,
+            error,
+        )
+        if unchanged.update(image_status=Recipe.IMAGE_FAILED):
+            transaction.on_commit(bump_recipes_version)
+        return
+
+    name, _ = os.path.splitext(os.path.basename(raw_name))
+    field = recipe.image.field
+    storage = field.storage
+    processed_name = storage.save(
+        field.generate_filename(recipe, f"{name}.{extension}"),
+        ContentFile(content),
+        max_length=field.max_length,
+    )
+    if not unchanged.update(
+        image=processed_name, image_status=Recipe.IMAGE_READY
+    ):
+        storage.delete(processed_name)
+        return
+    transaction.on_commit(bump_recipes_version)
+    if raw_name != processed_name:
+        storage.delete(raw_name)
+
+
+def _process_in_thread(recipe_id):
+    """Обрабатывает изображение в потоке пула с собственным соединением."""
+    close_old_connections()
+    try:
+        process_recipe_image(recipe_id)
+    except Exception:
+        logger.exception(
+            "Ошибка обработки изображения рецепта %s", recipe_id
+        )
+    finally:
+        connection.close()
+
+
+def schedule_recipe_image(recipe):
+    """
+    Ставит изображение рецепта в очередь обработки после фиксации
+    транзакции, в которой был сохранен рецепт.
+
+    При RECIPE_IMAGE_WORKERS = 0 изображение обрабатывается сразу после
+    фиксации, в том же потоке.
+    """
+
+    def submit():
+        if settings.RECIPE_IMAGE_WORKERS:
+            get_executor().submit(_process_in_thread, recipe.pk)
+        else:
+            process_recipe_image(recipe.pk)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,92 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db import DatabaseError
+
+MAX_CHAR = chr(0x10FFFF)
+
+
+class IngredientPrefixIndex:
+    """
+    Индекс каталога ингредиентов в памяти процесса для поиска по префиксу.
+
+    Хранит отсортированный массив наименований в нижнем регистре и
+    отвечает на запросы двумя бинарными поисками, без обращения к БД.
+    Индекс строится лениво при первом запросе (или заранее, при старте
+    воркера), сбрасывается сигналами об изменении Ingredient и
+    перестраивается не реже, чем раз в INGREDIENT_INDEX_TTL секунд,
+    чтобы изменения, сделанные в других процессах, не терялись.
+
+    Ключи и id публикуются одним кортежем _data и читаются одной
+    операцией: поиск не может получить ключи одного построения и id
+    другого.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._built_at = 0
+
+    def _is_expired(self):
+        ttl = getattr(settings, "INGREDIENT_INDEX_TTL", 300)
+        return time.monotonic() - self._built_at >= ttl
+
+    def build(self):
+        """
+        Перестраивает индекс по текущему содержимому таблицы.
+
+        Returns:
+            tuple: Отсортированные ключи и соответствующие им id.
+        """
+        from .models import Ingredient
+
+        rows = sorted(
+            (name.casefold(), pk)
+            for pk, name in Ingredient.objects.values_list("id", "name")
+        )
+        data = ([key for key, _ in rows], [pk for _, pk in rows])
+        with self._lock:
+            self._data = data
+            self._built_at = time.monotonic()
+        return data
+
+    def warm_up(self):
+        """
+        Строит индекс при старте воркера, чтобы первый запрос
+        автодополнения не ждал его построения. Если база данных
+        недоступна, индекс будет построен при первом запросе.
+        """
+        try:
+            self.build()
+        except DatabaseError:
+            pass
+
+    def invalidate(self):
+        """Сбрасывает индекс; он будет перестроен при следующем запросе."""
+        with self._lock:
+            self._data = None
+
+    def search(self, prefix):
+        """
+        Находит ингредиенты, наименование которых начинается с prefix.
+
+        Args:
+            prefix (str): Начало наименования, регистр не учитывается.
+
+        Returns:
+            list: Идентификаторы ингредиентов в алфавитном порядке.
+        """
+        data = self._data
+        if data is None or self._is_expired():
+            data = self.build()
+        keys, ids = data
+
+        prefix = prefix.casefold()
+        start = bisect_left(keys, prefix)
+        end = bisect_right(keys, prefix + MAX_CHAR, lo=start)
+        return ids[start:end]
+
+
+ingredient_index = IngredientPrefixIndex()
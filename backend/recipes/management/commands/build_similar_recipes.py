@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.similarity import (
+    SIMILARITY_INSTALLED,
+    SIMILARITY_METRICS,
+    SIMILARITY_REQUIREMENTS,
+    rebuild_similar_recipes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Рассчитывает похожие рецепты по пересечению составов и сохраняет "
+        "top-k соседей каждого рецепта. Запускается по расписанию."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            help="Количество соседей. По умолчанию SIMILAR_RECIPES_TOP_K.",
+        )
+        parser.add_argument(
+            "--metric", choices=SIMILARITY_METRICS, default="jaccard"
+        )
+
+    def handle(self, *args, **options):
+        if not SIMILARITY_INSTALLED:
+            raise CommandError(
+                "Для расчета похожих рецептов нужны numpy и scipy: "
+                f"pip install -r {SIMILARITY_REQUIREMENTS}"
+            )
+        start = time.perf_counter()
+        total = rebuild_similar_recipes(options["top_k"], options["metric"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Сохранено соседей: {total} "
+                f"({time.perf_counter() - start:.2f} с)."
+            )
+        )
@@ -1,15 +1,23 @@
 import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
 
 from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 
 from foodgram.settings import INGREDIENT_CSV_FILE_PATH
+from recipes.catalog import bump_catalog_version
+from recipes.ingredient_index import ingredient_index
 from recipes.models import Ingredient
 
 MODELS_FILES = {
     "Ingredient": "ingredients.csv",
 }
 
+FIELDNAMES = ["name", "measurement_unit"]
+
 
 def clear(self):
     """Функция очистки базы данных."""
@@ -17,6 +25,116 @@ def clear(self):
     self.stdout.write(self.style.SUCCESS("База данных успешно очищена."))
 
 
+def read_rows(file_path):
+    """
+    Построчно читает ингредиенты из CSV- или JSON-файла.
+
+    CSV-файл читается потоково. JSON-файл содержит один массив объектов,
+    поэтому загружается целиком и затем отдается по одной записи.
+
+    Yields:
+        tuple: Пара (наименование, единица измерения).
+    """
+    with open(file_path, "r", encoding="utf-8") as data_file:
+        if Path(file_path).suffix == ".json":
+            rows = json.load(data_file)
+        else:
+            rows = csv.DictReader(data_file, fieldnames=FIELDNAMES)
+
+        for row in rows:
+            yield row["name"].strip(), row["measurement_unit"].strip()
+
+
+def batched(rows, batch_size):
+    """Разбивает поток строк на списки длиной не более batch_size."""
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def upsert_batch(batch, seen, dry_run):
+    """
+    Добавляет в базу данных ингредиенты пакета, которых там еще нет.
+
+    Существующие строки определяются одним запросом на пакет, вставка
+    выполняется bulk_create с ignore_conflicts по ограничению
+    unique_ingredient_name_measurement_unit.
+
+    Returns:
+        tuple: Списки новых ингредиентов, уже существующих ингредиентов и
+               повторов внутри файла.
+    """
+    existing = set(
+        Ingredient.objects.filter(
+            name__in={name for name, _ in batch}
+        ).values_list("name", "measurement_unit")
+    )
+
+    new, unchanged, duplicates = [], [], []
+    for row in batch:
+        if row in seen:
+            duplicates.append(row)
+            continue
+        seen.add(row)
+        if row in existing:
+            unchanged.append(row)
+        else:
+            new.append(row)
+
+    if new and not dry_run:
+        Ingredient.objects.bulk_create(
+            [
+                Ingredient(name=name, measurement_unit=unit)
+                for name, unit in new
+            ],
+            ignore_conflicts=True,
+        )
+
+    return new, unchanged, duplicates
+
+
+def load_incremental(self, file_path, batch_size, dry_run):
+    """
+    Загружает ингредиенты без удаления существующих записей.
+
+    Ингредиенты, уже связанные с рецептами, не затрагиваются. У модели
+    Ingredient нет полей вне ключа (name, measurement_unit), поэтому
+    строки файла либо добавляются, либо остаются без изменений.
+    """
+    start = time.perf_counter()
+    seen = set()
+    inserted = unchanged = duplicates = 0
+
+    for batch in batched(read_rows(file_path), batch_size):
+        with transaction.atomic():
+            new, old, repeated = upsert_batch(batch, seen, dry_run)
+
+        inserted += len(new)
+        unchanged += len(old)
+        duplicates += len(repeated)
+
+        if dry_run:
+            for name, unit in new:
+                self.stdout.write(f"+ {name}, {unit}")
+
+    elapsed = time.perf_counter() - start
+    total = inserted + unchanged + duplicates
+
+    if inserted and not dry_run:
+        ingredient_index.invalidate()
+        bump_catalog_version()
+
+    prefix = "[dry-run] " if dry_run else ""
+    self.stdout.write(
+        self.style.SUCCESS(
+            f"{prefix}Добавлено: {inserted}, без изменений: {unchanged}, "
+            f"повторов в файле: {duplicates}. "
+            f"Обработано {total} строк за {elapsed:.2f} с "
+            f"({total / elapsed if elapsed else total:.0f} строк/с)."
+        )
+    )
+
+
 def load_ingredients(self):
     for model, file in MODELS_FILES.items():
         success = f"Таблица {model} успешно загружена."
@@ -25,8 +143,7 @@ def load_ingredients(self):
 
         try:
             with open(file_path, "r", encoding="utf-8") as csv_file:
-                fieldnames = ["name", "measurement_unit"]
-                reader = csv.DictReader(csv_file, fieldnames=fieldnames)
+                reader = csv.DictReader(csv_file, fieldnames=FIELDNAMES)
 
                 instances_to_create = []
 
@@ -37,6 +154,8 @@ def load_ingredients(self):
                 Ingredient.objects.bulk_create(
                     instances_to_create, ignore_conflicts=False
                 )
+                ingredient_index.invalidate()
+                bump_catalog_version()
                 self.stdout.write(self.style.SUCCESS(success))
 
         except (FileNotFoundError, IntegrityError, ValueError) as error:
@@ -46,6 +165,51 @@ def load_ingredients(self):
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **kwargs):
-        clear(self)
-        load_ingredients(self)
+    help = (
+        "Загружает каталог ингредиентов. По умолчанию добавляет только "
+        "отсутствующие ингредиенты, не удаляя существующие."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=f"{INGREDIENT_CSV_FILE_PATH}/{MODELS_FILES['Ingredient']}",
+            help="Путь к CSV- или JSON-файлу с ингредиентами.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Количество строк, обрабатываемых за один запрос.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Показать добавляемые ингредиенты, не изменяя базу данных.",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help=(
+                "Удалить все ингредиенты и загрузить каталог заново. "
+                "Удаляет также ингредиенты во всех рецептах!"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            clear(self)
+            load_ingredients(self)
+            return
+
+        try:
+            load_incremental(
+                self,
+                options["file"],
+                options["batch_size"],
+                options["dry_run"],
+            )
+        except (FileNotFoundError, KeyError, ValueError) as error:
+            self.stdout.write(
+                self.style.ERROR(f"Ошибка в загрузке. {error}.")
+            )
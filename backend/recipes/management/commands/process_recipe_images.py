@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import process_recipe_image
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        "Обрабатывает изображения рецептов, оставшиеся в очереди, "
+        "например после перезапуска воркеров."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Повторить обработку изображений с ошибкой.",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            Recipe.objects.filter(image_status=Recipe.IMAGE_FAILED).update(
+                image_status=Recipe.IMAGE_PENDING
+            )
+
+        recipe_ids = Recipe.objects.filter(
+            image_status=Recipe.IMAGE_PENDING
+        ).values_list("id", flat=True)
+
+        for recipe_id in recipe_ids.iterator():
+            process_recipe_image(recipe_id)
+
+        failed = Recipe.objects.filter(
+            image_status=Recipe.IMAGE_FAILED
+        ).count()
+        self.stdout.write(
+            self.style.SUCCESS(f"Готово. Ошибок обработки: {failed}.")
+        )
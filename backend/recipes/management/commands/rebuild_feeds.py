@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.feed import rebuild_feeds
+
+
+class Command(BaseCommand):
+    help = (
+        "Заново строит ленты подписок всех пользователей. Нужна после "
+        "массовой загрузки подписок или рецептов в обход сигналов."
+    )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            total = rebuild_feeds()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Записей в лентах: {total} "
+                f"({time.perf_counter() - start:.2f} с)."
+            )
+        )
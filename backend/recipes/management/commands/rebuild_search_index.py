@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from recipes.search import rebuild_search, uses_postgres_search
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает поисковые векторы всех рецептов (PostgreSQL) или "
+        "сбрасывает запасной поисковый индекс в памяти процессов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild_search(options["batch_size"])
+        if not uses_postgres_search():
+            self.stdout.write(
+                self.style.SUCCESS("Запасной поисковый индекс сброшен.")
+            )
+            return
+        self.stdout.write(self.style.SUCCESS(f"Обновлено рецептов: {count}."))
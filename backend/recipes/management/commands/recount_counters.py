@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.counters import recount_author_counters, recount_recipe_counters
+from recipes.models import Recipe
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает денормализованные счетчики favorites_count, "
+        "shopping_cart_count рецептов и recipes_count пользователей."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        recipes = self.recount(
+            Recipe, recount_recipe_counters, options["batch_size"]
+        )
+        users = self.recount(
+            User, recount_author_counters, options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Пересчитано рецептов: {recipes}, пользователей: {users} "
+                f"за {time.perf_counter() - start:.2f} с."
+            )
+        )
+
+    def recount(self, model, recount, batch_size):
+        """Пересчитывает счетчики диапазонами первичных ключей."""
+        ids = list(model.objects.order_by("pk").values_list("pk", flat=True))
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            with transaction.atomic():
+                updated += recount(
+                    model.objects.filter(pk__gte=batch[0], pk__lte=batch[-1])
+                )
+        return updated
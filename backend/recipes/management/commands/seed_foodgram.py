@@ -0,0 +1,263 @@
+import csv
+import io
+import random
+import time
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from foodgram.settings import INGREDIENT_CSV_FILE_PATH
+from recipes.counters import recount_author_counters, recount_recipe_counters
+from recipes.coverage import invalidate_coverage
+from recipes.feed import rebuild_feeds
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from recipes.search import rebuild_search
+from users.models import Subscription, User
+
+SEED_PREFIX = "seed"
+SEED_PASSWORD = "seed-password"
+SEED_IMAGE_NAME = "recipes_image/seed.jpg"
+
+TAGS = (
+    ("Завтрак", "#E26C2D", "breakfast"),
+    ("Обед", "#49B64E", "lunch"),
+    ("Ужин", "#8775D2", "dinner"),
+)
+
+
+class ZipfSampler:
+    """
+    Выбирает элементы последовательности с вероятностью, обратно
+    пропорциональной рангу в степени s: первые элементы популярнее.
+    """
+
+    def __init__(self, items, s, rng):
+        self.items = list(items)
+        self.cum_weights = list(
+            accumulate(1 / rank**s for rank in range(1, len(self.items) + 1))
+        )
+        self.rng = rng
+
+    def sample(self, k):
+        """Возвращает до k различных элементов."""
+        k = min(k, len(self.items))
+        chosen = set()
+        for _ in range(10):
+            if len(chosen) >= k:
+                break
+            chosen.update(
+                self.rng.choices(
+                    self.items, cum_weights=self.cum_weights, k=k - len(chosen)
+                )
+            )
+        return list(chosen)
+
+
+def batched_create(model, objects, batch_size, **kwargs):
+    """Создает объекты пакетами через bulk_create."""
+    for start in range(0, len(objects), batch_size):
+        model.objects.bulk_create(
+            objects[start:start + batch_size], **kwargs
+        )
+
+
+def ensure_ingredients():
+    """Загружает каталог ингредиентов из CSV, если таблица пуста."""
+    if Ingredient.objects.exists():
+        return
+    file_path = f"{INGREDIENT_CSV_FILE_PATH}/ingredients.csv"
+    with open(file_path, "r", encoding="utf-8") as csv_file:
+        Ingredient.objects.bulk_create(
+            [
+                Ingredient(name=name, measurement_unit=unit)
+                for name, unit in csv.reader(csv_file)
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def ensure_seed_image():
+    """Сохраняет одну картинку, общую для всех сгенерированных рецептов."""
+    if not default_storage.exists(SEED_IMAGE_NAME):
+        buffer = io.BytesIO()
+        Image.new("RGB", (480, 320), "#E26C2D").save(buffer, format="JPEG")
+        default_storage.save(SEED_IMAGE_NAME, ContentFile(buffer.getvalue()))
+    return SEED_IMAGE_NAME
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу синтетическими пользователями, подписками, "
+        "рецептами, избранным и корзинами с распределением Ципфа."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--recipes", type=int, default=10000)
+        parser.add_argument(
+            "--subscriptions-per-user", type=int, default=20
+        )
+        parser.add_argument("--favorites-per-user", type=int, default=30)
+        parser.add_argument("--cart-per-user", type=int, default=5)
+        parser.add_argument(
+            "--ingredients-per-recipe", type=int, default=8
+        )
+        parser.add_argument(
+            "--zipf",
+            type=float,
+            default=1.1,
+            help="Показатель распределения Ципфа.",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=SEED_PREFIX).exists():
+            raise CommandError(
+                "Синтетические данные уже загружены. "
+                "Используйте чистую базу данных."
+            )
+
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        start = time.perf_counter()
+
+        ensure_ingredients()
+        image = ensure_seed_image()
+
+        with transaction.atomic():
+            tags = [
+                Tag.objects.get_or_create(
+                    slug=slug, defaults={"name": name, "color": color}
+                )[0]
+                for name, color, slug in TAGS
+            ]
+
+            password = make_password(SEED_PASSWORD)
+            users = [
+                User(
+                    username=f"{SEED_PREFIX}{number}",
+                    email=f"{SEED_PREFIX}{number}@example.com",
+                    first_name="Имя",
+                    last_name="Фамилия",
+                    password=password,
+                )
+                for number in range(options["users"])
+            ]
+            batched_create(User, users, batch_size)
+            users = list(
+                User.objects.filter(
+                    username__startswith=SEED_PREFIX
+                ).order_by("id")
+            )
+            batched_create(
+                Token,
+                [Token(user=user, key=Token.generate_key()) for user in users],
+                batch_size,
+            )
+            self.report("Пользователи", len(users), start)
+
+            authors = ZipfSampler(users, options["zipf"], rng)
+            recipes = [
+                Recipe(
+                    author=authors.sample(1)[0],
+                    name=f"{SEED_PREFIX} рецепт {number}",
+                    text="Сгенерированный рецепт.",
+                    image=image,
+                    cooking_time=rng.randint(5, 180),
+                )
+                for number in range(options["recipes"])
+            ]
+            batched_create(Recipe, recipes, batch_size)
+            recipes = list(
+                Recipe.objects.filter(
+                    name__startswith=SEED_PREFIX
+                ).order_by("id")
+            )
+            self.report("Рецепты", len(recipes), start)
+
+            catalog = list(Ingredient.objects.order_by("id"))
+            rng.shuffle(catalog)
+            ingredients = ZipfSampler(catalog, options["zipf"], rng)
+            recipe_ingredients = []
+            recipe_tags = []
+            for recipe in recipes:
+                for ingredient in ingredients.sample(
+                    options["ingredients_per_recipe"]
+                ):
+                    recipe_ingredients.append(
+                        RecipeIngredient(
+                            recipe=recipe,
+                            ingredient=ingredient,
+                            amount=rng.randint(1, 500),
+                        )
+                    )
+                for tag in rng.sample(tags, rng.randint(1, len(tags))):
+                    recipe_tags.append(
+                        Recipe.tags.through(recipe=recipe, tag=tag)
+                    )
+            batched_create(RecipeIngredient, recipe_ingredients, batch_size)
+            batched_create(Recipe.tags.through, recipe_tags, batch_size)
+            self.report(
+                "Ингредиенты рецептов", len(recipe_ingredients), start
+            )
+
+            popular_recipes = ZipfSampler(recipes, options["zipf"], rng)
+            subscriptions, favorites, carts = [], [], []
+            for user in users:
+                for author in authors.sample(
+                    options["subscriptions_per_user"]
+                ):
+                    if author != user:
+                        subscriptions.append(
+                            Subscription(follower=user, author=author)
+                        )
+                for recipe in popular_recipes.sample(
+                    options["favorites_per_user"]
+                ):
+                    favorites.append(Favorite(user=user, recipe=recipe))
+                for recipe in popular_recipes.sample(
+                    options["cart_per_user"]
+                ):
+                    carts.append(ShoppingCart(user=user, recipe=recipe))
+
+            batched_create(Subscription, subscriptions, batch_size)
+            batched_create(Favorite, favorites, batch_size)
+            batched_create(ShoppingCart, carts, batch_size)
+            # bulk_create не отправляет сигналы, поэтому счетчики, ленты,
+            # поисковые данные и индексы обновляются явно.
+            recount_recipe_counters(Recipe.objects.all())
+            recount_author_counters(User.objects.all())
+            rebuild_feeds()
+            transaction.on_commit(invalidate_coverage)
+            transaction.on_commit(rebuild_search)
+            self.report(
+                "Подписки, избранное и корзины",
+                len(subscriptions) + len(favorites) + len(carts),
+                start,
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово. Пароль пользователей: {SEED_PASSWORD}."
+            )
+        )
+
+    def report(self, title, count, start):
+        self.stdout.write(
+            f"{title}: {count} ({time.perf_counter() - start:.1f} с)"
+        )
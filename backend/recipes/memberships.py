@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .catalog import bump_version, get_version
+
+FAVORITES = "favorites"
+SHOPPING_CART = "shopping_cart"
+EMPTY_MEMBERSHIPS = {FAVORITES: frozenset(), SHOPPING_CART: frozenset()}
+
+
+def get_version_key(user_id):
+    return f"recipe_memberships_version:{user_id}"
+
+
+class RecipeMembershipCache:
+    """
+    Множества id рецептов в избранном и в корзине пользователей.
+
+    Множества хранятся в памяти процесса для не более чем
+    RECIPE_MEMBERSHIP_CACHE_SIZE недавно активных пользователей (LRU) и
+    загружаются двумя запросами при промахе. Актуальность записи
+    проверяется по версии пользователя в кэше Django: изменение множеств
+    увеличивает версию и удаляет запись процесса, поэтому во всех
+    процессах она загружается заново при следующем чтении.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_max_size(self):
+        return getattr(settings, "RECIPE_MEMBERSHIP_CACHE_SIZE", 1000)
+
+    def load(self, user_id):
+        """Загружает множества пользователя из базы данных."""
+        from .models import Favorite, ShoppingCart
+
+        return {
+            FAVORITES: frozenset(
+                Favorite.objects.filter(user_id=user_id).values_list(
+                    "recipe_id", flat=True
+                )
+            ),
+            SHOPPING_CART: frozenset(
+                ShoppingCart.objects.filter(user_id=user_id).values_list(
+                    "recipe_id", flat=True
+                )
+            ),
+        }
+
+    def get(self, user):
+        """
+        Возвращает множества рецептов пользователя.
+
+        Returns:
+            dict: Множества id рецептов по ключам FAVORITES и SHOPPING_CART.
+        """
+        if user.is_anonymous:
+            return EMPTY_MEMBERSHIPS
+
+        version = get_version(get_version_key(user.pk))
+        with self._lock:
+            entry = self._entries.get(user.pk)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(user.pk)
+                return entry[1]
+
+        memberships = self.load(user.pk)
+        with self._lock:
+            self._entries[user.pk] = (version, memberships)
+            self._entries.move_to_end(user.pk)
+            while len(self._entries) > self.get_max_size():
+                self._entries.popitem(last=False)
+        return memberships
+
+    def invalidate(self, user_id):
+        """
+        Отмечает изменение множеств пользователя.
+
+        Вызывается после фиксации транзакции. Запись процесса не
+        дополняется на месте, а удаляется: cache.incr не везде атомарен
+        (например, в FileBasedCache), и два процесса могут получить одну
+        и ту же новую версию, не увидев изменений друг друга.
+        """
+        bump_version(get_version_key(user_id))
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+membership_cache = RecipeMembershipCache()
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:36
+
+import datetime
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def backfill_pub_date(apps, schema_editor):
+    """
+    Задает существующим рецептам различные даты публикации в порядке id,
+    чтобы курсорная навигация не упиралась в совпадающие значения.
+    """
+    Recipe = apps.get_model("recipes", "Recipe")
+    now = django.utils.timezone.now()
+    recipes = list(Recipe.objects.only("id").order_by("-id"))
+    for position, recipe in enumerate(recipes):
+        recipe.pub_date = now - datetime.timedelta(milliseconds=position)
+    Recipe.objects.bulk_update(recipes, ["pub_date"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_recipe_image_status'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='recipe',
+            options={'ordering': ('-pub_date', '-id'), 'verbose_name': 'Рецепт', 'verbose_name_plural': 'Рецепты'},
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Дата публикации'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_pub_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-pub_date', '-id'], name='recipe_pub_date_id_idx'),
+        ),
+    ]
@@ -1,8 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from colorfield.fields import ColorField
 
-from users.models import User
+from users.models import Subscription, User
 
 from .validators import (
     CookingTime_Validator,
@@ -60,7 +62,92 @@ class Ingredient(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    def with_related(self):
+        """Подгружает теги и ингредиенты рецептов фиксированным числом
+        запросов, независимо от количества рецептов."""
+        return self.prefetch_related(
+            "tags",
+            models.Prefetch(
+                "recipe_ingredients",
+                queryset=RecipeIngredient.objects.select_related(
+                    "ingredient"
+                ),
+            ),
+        )
+
+    def limit_per_author(self, limit):
+        """
+        Оставляет не более limit последних рецептов каждого автора.
+
+        Ограничение выполняется в базе данных коррелированным подзапросом,
+        поэтому в Python не попадают лишние рецепты.
+        """
+        return self.filter(
+            pk__in=models.Subquery(
+                Recipe.objects.filter(author=models.OuterRef("author"))
+                .order_by("-pub_date", "-id")
+                .values("pk")[:limit]
+            )
+        )
+
+    def first_in_queryset(self, ids, limit):
+        """
+        Возвращает первые limit идентификаторов из ids (в их порядке),
+        рецепты с которыми проходят фильтры queryset.
+
+        Идентификаторы проверяются частями по limit штук, пока не
+        наберется limit подходящих, поэтому размер условия IN не зависит
+        от длины ids.
+        """
+        selected = []
+        for start in range(0, len(ids), limit):
+            chunk = ids[start:start + limit]
+            present = set(
+                self.filter(pk__in=chunk)
+                .order_by()
+                .values_list("pk", flat=True)
+            )
+            selected.extend(pk for pk in chunk if pk in present)
+            if len(selected) >= limit:
+                break
+        return selected[:limit]
+
+    def with_user_annotations(self, user):
+        """
+        Добавляет к автору рецепта флаг is_subscribed для пользователя user.
+
+        Автор подгружается отдельным запросом через Prefetch, чтобы
+        аннотация оказалась на самом объекте пользователя. Флаги
+        is_favorited и is_in_shopping_cart вычисляются сериализатором по
+        множествам из recipes.memberships.
+        """
+        if user.is_anonymous:
+            is_subscribed = models.Value(False)
+        else:
+            is_subscribed = models.Exists(
+                Subscription.objects.filter(
+                    author=models.OuterRef("pk"), follower=user
+                )
+            )
+        return self.prefetch_related(
+            models.Prefetch(
+                "author",
+                queryset=User.objects.annotate(is_subscribed=is_subscribed),
+            )
+        )
+
+
 class Recipe(models.Model):
+    IMAGE_PENDING = "pending"
+    IMAGE_READY = "ready"
+    IMAGE_FAILED = "failed"
+    IMAGE_STATUSES = (
+        (IMAGE_PENDING, "Обрабатывается"),
+        (IMAGE_READY, "Готово"),
+        (IMAGE_FAILED, "Ошибка обработки"),
+    )
+
     author = models.ForeignKey(
         verbose_name="Автор рецепта",
         to=User,
@@ -77,6 +164,12 @@ class Recipe(models.Model):
         verbose_name="Картинка, закодированная в Base64",
         upload_to="recipes_image/",
     )
+    image_status = models.CharField(
+        verbose_name="Статус обработки картинки",
+        max_length=16,
+        choices=IMAGE_STATUSES,
+        default=IMAGE_READY,
+    )
     text = models.TextField(
         verbose_name="Описание",
     )
@@ -98,9 +191,42 @@ class Recipe(models.Model):
         ],
     )
 
+    pub_date = models.DateTimeField(
+        verbose_name="Дата публикации",
+        auto_now_add=True,
+    )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name="В избранном",
+        default=0,
+        editable=False,
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        verbose_name="В списках покупок",
+        default=0,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        verbose_name="Поисковый вектор",
+        null=True,
+        editable=False,
+    )
+
+    objects = RecipeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
+        ordering = ("-pub_date", "-id")
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"],
+                name="recipe_pub_date_id_idx",
+            ),
+            GinIndex(
+                fields=["search_vector"],
+                name="recipe_search_vector_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -173,3 +299,85 @@ class ShoppingCart(BaseCartItem):
                 fields=("user", "recipe"), name="unique_recipe_cart"
             )
         ]
+
+
+class FeedEntry(models.Model):
+    """
+    Строка ленты подписчика: рецепт автора, на которого он подписан.
+
+    Лента заполняется при публикации рецепта для всех подписчиков автора
+    и при подписке - рецептами автора, поэтому страница ленты читается
+    одним диапазоном индекса (follower, -pub_date, -recipe).
+    """
+
+    follower = models.ForeignKey(
+        to=User,
+        verbose_name="Подписчик",
+        on_delete=models.CASCADE,
+        related_name="feed_entries",
+    )
+    author = models.ForeignKey(
+        to=User,
+        verbose_name="Автор",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    recipe = models.ForeignKey(
+        to=Recipe,
+        verbose_name="Рецепт",
+        on_delete=models.CASCADE,
+        related_name="feed_entries",
+    )
+    pub_date = models.DateTimeField(verbose_name="Дата публикации")
+
+    class Meta:
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи ленты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("follower", "recipe"), name="unique_feed_entry"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["follower", "-pub_date", "-recipe"],
+                name="feed_follower_pub_date_idx",
+            ),
+            models.Index(
+                fields=["follower", "author"],
+                name="feed_follower_author_idx",
+            ),
+        ]
+
+
+class SimilarRecipe(models.Model):
+    """
+    Предрасчитанный сосед рецепта по составу ингредиентов.
+
+    Таблица заполняется командой build_similar_recipes: для каждого рецепта
+    хранится не более SIMILAR_RECIPES_TOP_K соседей, упорядоченных по rank.
+    """
+
+    recipe = models.ForeignKey(
+        to=Recipe,
+        verbose_name="Рецепт",
+        on_delete=models.CASCADE,
+        related_name="similar_recipes",
+    )
+    similar = models.ForeignKey(
+        to=Recipe,
+        verbose_name="Похожий рецепт",
+        on_delete=models.CASCADE,
+        related_name="similar_to",
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name="Место")
+    score = models.FloatField(verbose_name="Сходство")
+
+    class Meta:
+        verbose_name = "Похожий рецепт"
+        verbose_name_plural = "Похожие рецепты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("recipe", "rank"), name="unique_similar_recipe_rank"
+            )
+        ]
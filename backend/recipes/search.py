@@ -0,0 +1,240 @@
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    TextField,
+    Value,
+    When,
+)
+
+from .catalog import bump_version, get_version
+
+SEARCH_CONFIG = "russian"
+SEARCH_VERSION_KEY = "recipe_search_version"
+
+# Веса полей соответствуют весам A, B и C в SearchRank PostgreSQL.
+FIELD_WEIGHTS = {"name": 1.0, "ingredients": 0.4, "text": 0.2}
+
+WORD_RE = re.compile(r"\w+")
+RUSSIAN_ENDINGS = sorted(
+    (
+        "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими",
+        "ией", "ий", "ый", "ой", "ая", "яя", "ое", "ее", "ые", "ие", "ом",
+        "ем", "ам", "ям", "ах", "ях", "ов", "ев", "ей", "ию", "ия", "ии",
+        "ью", "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й",
+    ),
+    key=len,
+    reverse=True,
+)
+MIN_STEM_LENGTH = 3
+
+
+def uses_postgres_search():
+    """Проверяет, доступен ли полнотекстовый поиск PostgreSQL."""
+    return connection.vendor == "postgresql"
+
+
+def stem(word):
+    """
+    Отбрасывает типичное окончание русского слова.
+
+    Грубое приближение стеммера конфигурации russian PostgreSQL,
+    достаточное для запасного индекса.
+    """
+    word = word.replace("ё", "е")
+    for ending in RUSSIAN_ENDINGS:
+        if (
+            word.endswith(ending)
+            and len(word) - len(ending) >= MIN_STEM_LENGTH
+        ):
+            return word[: -len(ending)]
+    return word
+
+
+def tokenize(text):
+    """Разбивает текст на основы слов в нижнем регистре."""
+    return [stem(word) for word in WORD_RE.findall(text.casefold())]
+
+
+def search_vector_expression(recipe_ingredient_model):
+    """
+    Возвращает выражение поискового вектора рецепта: название (вес A),
+    наименования ингредиентов (вес B) и описание (вес C).
+    """
+    ingredient_names = Subquery(
+        recipe_ingredient_model.objects.filter(recipe=OuterRef("pk"))
+        .values("recipe")
+        .annotate(names=StringAgg("ingredient__name", " "))
+        .values("names"),
+        output_field=TextField(),
+    )
+    return (
+        SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(ingredient_names, weight="B", config=SEARCH_CONFIG)
+        + SearchVector("text", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+class RecipeSearchIndex:
+    """
+    Инвертированный индекс рецептов в памяти процесса.
+
+    Используется вместо поискового вектора, когда база данных не
+    PostgreSQL. Для каждой основы слова хранит вес совпадения по
+    рецептам. Индекс перестраивается целиком, когда меняется версия
+    SEARCH_VERSION_KEY в кэше, поэтому изменения из других процессов
+    тоже учитываются.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._version = None
+
+    def build(self, version):
+        """
+        Перестраивает индекс по текущему содержимому базы данных.
+
+        Returns:
+            dict: Веса рецептов по основам слов.
+        """
+        from .models import Recipe, RecipeIngredient
+
+        postings = defaultdict(lambda: defaultdict(float))
+
+        def add(recipe_id, text, weight):
+            for token in tokenize(text):
+                postings[token][recipe_id] += weight
+
+        for pk, name, text in Recipe.objects.values_list(
+            "id", "name", "text"
+        ).iterator():
+            add(pk, name, FIELD_WEIGHTS["name"])
+            add(pk, text, FIELD_WEIGHTS["text"])
+        for recipe_id, name in RecipeIngredient.objects.values_list(
+            "recipe_id", "ingredient__name"
+        ).iterator():
+            add(recipe_id, name, FIELD_WEIGHTS["ingredients"])
+
+        postings = {token: dict(ids) for token, ids in postings.items()}
+        with self._lock:
+            self._postings, self._version = postings, version
+        return postings
+
+    def search(self, query):
+        """
+        Находит рецепты, содержащие все слова запроса.
+
+        Returns:
+            list: Идентификаторы рецептов по убыванию релевантности.
+        """
+        version = get_version(SEARCH_VERSION_KEY)
+        postings = self._postings
+        if postings is None or self._version != version:
+            postings = self.build(version)
+
+        scores = None
+        for term in set(tokenize(query)):
+            matches = postings.get(term, {})
+            if scores is None:
+                scores = dict(matches)
+            else:
+                scores = {
+                    pk: score + matches[pk]
+                    for pk, score in scores.items()
+                    if pk in matches
+                }
+        if not scores:
+            return []
+        return sorted(scores, key=lambda pk: (-scores[pk], -pk))
+
+
+recipe_search_index = RecipeSearchIndex()
+
+
+def refresh_search(recipe_ids):
+    """
+    Обновляет поисковые данные рецептов после их изменения.
+
+    В PostgreSQL пересчитывает поисковый вектор указанных рецептов одним
+    UPDATE, в остальных базах сбрасывает запасной индекс.
+    """
+    from .models import Recipe, RecipeIngredient
+
+    if not uses_postgres_search():
+        bump_version(SEARCH_VERSION_KEY)
+        return
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        search_vector=search_vector_expression(RecipeIngredient)
+    )
+
+
+def rebuild_search(batch_size=1000):
+    """
+    Обновляет поисковые данные всех рецептов.
+
+    В PostgreSQL пересчитывает поисковые векторы пачками по batch_size
+    рецептов, в остальных базах сбрасывает запасной индекс.
+
+    Returns:
+        int: Количество рецептов с пересчитанным поисковым вектором.
+    """
+    from .models import Recipe
+
+    if not uses_postgres_search():
+        refresh_search([])
+        return 0
+    ids = list(Recipe.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(ids), batch_size):
+        refresh_search(ids[start:start + batch_size])
+    return len(ids)
+
+
+def search_recipes(queryset, query):
+    """
+    Оставляет рецепты, подходящие под поисковый запрос, и сортирует их
+    по релевантности.
+
+    В PostgreSQL используется поисковый вектор с GIN-индексом, в
+    остальных базах - запасной индекс в памяти, результаты которого
+    ограничены RECIPE_SEARCH_FALLBACK_LIMIT рецептами. Ограничение
+    применяется после остальных фильтров queryset.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+
+    if uses_postgres_search():
+        search_query = SearchQuery(query, config=SEARCH_CONFIG)
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(search_rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-search_rank", "-pub_date", "-id")
+        )
+
+    limit = getattr(settings, "RECIPE_SEARCH_FALLBACK_LIMIT", 500)
+    ids = recipe_search_index.search(query)
+    if len(ids) > limit:
+        ids = queryset.first_in_queryset(ids, limit)
+    if not ids:
+        return queryset.none()
+    return queryset.filter(pk__in=ids).order_by(
+        Case(
+            *[When(pk=pk, then=Value(rank)) for rank, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+    )
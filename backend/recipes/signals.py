@@ -0,0 +1,181 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import Subscription, User
+
+from .catalog import bump_catalog_version, bump_recipes_version
+from .counters import change_counter
+from .coverage import invalidate_coverage
+from .feed import backfill_subscription, fan_out_recipe, prune_subscription
+from .ingredient_index import ingredient_index
+from .memberships import membership_cache
+from .models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from .search import refresh_search
+
+SEARCH_FIELDS = {"name", "text"}
+AUTHOR_FIELDS = {"username", "first_name", "last_name", "email"}
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    """Сбрасывает индекс ингредиентов при изменении каталога."""
+    ingredient_index.invalidate()
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Сбрасывает кэш ответов каталога при изменении тегов и ингредиентов."""
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_recipe_search(sender, instance, update_fields=None, **kwargs):
+    """
+    Обновляет поисковые данные рецепта после фиксации транзакции, когда
+    ингредиенты рецепта уже сохранены.
+    """
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    transaction.on_commit(lambda: refresh_search([instance.pk]))
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_recipe_search(sender, instance, **kwargs):
+    """Убирает удаленный рецепт из запасного поискового индекса."""
+    transaction.on_commit(lambda: refresh_search([]))
+
+
+@receiver(post_save, sender=Ingredient)
+def refresh_ingredient_recipes_search(sender, instance, created, **kwargs):
+    """Обновляет поисковые данные рецептов при переименовании ингредиента."""
+    if created:
+        return
+    recipe_ids = list(
+        Recipe.objects.filter(ingredients=instance).values_list(
+            "id", flat=True
+        )
+    )
+    if recipe_ids:
+        transaction.on_commit(lambda: refresh_search(recipe_ids))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def refresh_recipe_coverage(sender, update_fields=None, **kwargs):
+    """
+    Обновляет индекс ингредиентов рецептов после фиксации транзакции,
+    когда состав рецепта уже сохранен. Сохранение отдельных полей
+    состав не меняет.
+    """
+    if update_fields is not None:
+        return
+    transaction.on_commit(invalidate_coverage)
+
+
+@receiver(post_delete, sender=Ingredient)
+def invalidate_recipe_coverage(sender, **kwargs):
+    """
+    Перестраивает индекс ингредиентов рецептов после удаления
+    ингредиента из каталога вместе с его строками в рецептах.
+    """
+    transaction.on_commit(invalidate_coverage)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_save, sender=Recipe)
+def increment_counters(sender, instance, created, **kwargs):
+    """Увеличивает денормализованный счетчик при создании строки."""
+    if created:
+        update_counter(sender, instance, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_delete, sender=Recipe)
+def decrement_counters(sender, instance, **kwargs):
+    """Уменьшает денормализованный счетчик при удалении строки."""
+    update_counter(sender, instance, -1)
+
+
+def update_counter(sender, instance, delta):
+    if sender is Recipe:
+        change_counter(User, instance.author_id, "recipes_count", delta)
+    elif sender is Favorite:
+        change_counter(Recipe, instance.recipe_id, "favorites_count", delta)
+    else:
+        change_counter(
+            Recipe, instance.recipe_id, "shopping_cart_count", delta
+        )
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def invalidate_recipes_cache(sender, **kwargs):
+    """Сбрасывает кэш ответов рецептов после фиксации изменений."""
+    transaction.on_commit(bump_recipes_version)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_recipes_cache_on_author(sender, update_fields=None, **kwargs):
+    """
+    Сбрасывает кэш ответов рецептов при изменении данных пользователя,
+    которые выводятся в карточке автора.
+    """
+    if update_fields is not None and not AUTHOR_FIELDS & set(update_fields):
+        return
+    transaction.on_commit(bump_recipes_version)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def invalidate_memberships(sender, instance, created=False, **kwargs):
+    """
+    Сбрасывает множества пользователя после фиксации добавления или
+    удаления рецепта.
+    """
+    if kwargs["signal"] is post_save and not created:
+        return
+    transaction.on_commit(
+        lambda: membership_cache.invalidate(instance.user_id)
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def add_recipe_to_feeds(sender, instance, created, **kwargs):
+    """
+    Добавляет новый рецепт в ленты подписчиков автора после фиксации
+    транзакции: вставка в ленты не удлиняет транзакцию создания.
+    """
+    if created:
+        transaction.on_commit(lambda: fan_out_recipe(instance))
+
+
+@receiver(post_save, sender=Subscription)
+def backfill_feed(sender, instance, created, **kwargs):
+    """Добавляет рецепты автора в ленту нового подписчика."""
+    if created:
+        backfill_subscription(instance.follower_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def prune_feed(sender, instance, **kwargs):
+    """Убирает рецепты автора из ленты после отписки."""
+    prune_subscription(instance.follower_id, instance.author_id)
@@ -0,0 +1,153 @@
+from django.conf import settings
+from django.db import transaction
+
+from .models import RecipeIngredient, SimilarRecipe
+
+# numpy и scipy нужны только для расчета соседей, поэтому в образ
+# веб-приложения не входят и устанавливаются отдельным файлом
+# зависимостей.
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    SIMILARITY_INSTALLED = False
+else:
+    SIMILARITY_INSTALLED = True
+
+SIMILARITY_REQUIREMENTS = "requirements-similarity.txt"
+SIMILARITY_METRICS = ("jaccard", "cosine")
+SIMILARITY_BLOCK_SIZE = 256
+SIMILAR_BATCH_SIZE = 5000
+
+
+def build_matrix(pairs):
+    """
+    Строит бинарную матрицу "рецепты x ингредиенты" в формате CSR.
+
+    Args:
+        pairs: Пары (recipe_id, ingredient_id).
+
+    Returns:
+        tuple: Массив id рецептов в порядке строк матрицы и матрица.
+    """
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    recipe_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    ingredient_ids, columns = np.unique(pairs[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (rows, columns)),
+        shape=(len(recipe_ids), len(ingredient_ids)),
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return recipe_ids, matrix
+
+
+def top_k_neighbours(
+    matrix, k, metric="jaccard", block_size=SIMILARITY_BLOCK_SIZE
+):
+    """
+    Находит для каждой строки матрицы k наиболее похожих строк.
+
+    Пересечения составов считаются умножением матрицы на плотный блок из
+    block_size строк, поэтому в памяти одновременно находится не более
+    block_size x n значений сходства, а не вся матрица n x n.
+
+    Args:
+        matrix: Бинарная CSR-матрица "рецепты x ингредиенты".
+        k: Количество соседей.
+        metric: "jaccard" или "cosine".
+        block_size: Количество строк, обрабатываемых за один шаг.
+
+    Returns:
+        tuple: Массивы n x k номеров соседей и их сходства по убыванию.
+               Если соседей с ненулевым сходством меньше k, оставшиеся
+               номера равны -1.
+    """
+    if metric not in SIMILARITY_METRICS:
+        raise ValueError(f"Неизвестная метрика сходства: {metric}.")
+
+    count = matrix.shape[0]
+    k = min(k, count - 1)
+    neighbours = np.full((count, max(k, 0)), -1, dtype=np.int64)
+    scores = np.zeros((count, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return neighbours, scores
+
+    sizes = np.asarray(matrix.sum(axis=1), dtype=np.float32).ravel()
+    for start in range(0, count, block_size):
+        stop = min(start + block_size, count)
+        rows = np.arange(stop - start)
+        block_sizes = sizes[start:stop, None]
+
+        # Произведение CSR на плотный блок в F-порядке в несколько раз
+        # быстрее, чем на блок в C-порядке. Результат копируется в
+        # C-порядок: деление и поиск соседей идут по строкам.
+        similarity = np.ascontiguousarray(
+            (matrix @ matrix[start:stop].toarray().T).T
+        )
+        if metric == "cosine":
+            denominator = np.sqrt(block_sizes * sizes)
+        else:
+            denominator = block_sizes + sizes
+            denominator -= similarity
+        np.divide(similarity, denominator, out=similarity)
+        similarity[rows, rows + start] = 0
+
+        # argpartition ищет наименьшие значения, поэтому знак меняется на
+        # месте, без копии блока.
+        np.negative(similarity, out=similarity)
+        candidates = np.argpartition(similarity, k - 1, axis=1)[:, :k]
+        candidate_scores = -np.take_along_axis(similarity, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        block_neighbours = np.take_along_axis(candidates, order, axis=1)
+        block_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+        block_neighbours[block_scores <= 0] = -1
+        neighbours[start:stop] = block_neighbours
+        scores[start:stop] = block_scores
+    return neighbours, scores
+
+
+def rebuild_similar_recipes(k=None, metric="jaccard"):
+    """
+    Заново рассчитывает похожие рецепты и сохраняет top-k соседей
+    каждого рецепта в таблицу SimilarRecipe.
+
+    Расчет выполняется до начала транзакции, поэтому старые соседи
+    остаются доступны на чтение до записи новых.
+
+    Returns:
+        int: Количество сохраненных строк.
+    """
+    k = k or settings.SIMILAR_RECIPES_TOP_K
+    pairs = list(
+        RecipeIngredient.objects.values_list(
+            "recipe_id", "ingredient_id"
+        ).iterator()
+    )
+    recipe_ids, matrix = build_matrix(pairs)
+    neighbours, scores = top_k_neighbours(matrix, k, metric)
+
+    with transaction.atomic():
+        SimilarRecipe.objects.all().delete()
+        batch, total = [], 0
+        for row, recipe_id in enumerate(recipe_ids.tolist()):
+            for rank, (column, score) in enumerate(
+                zip(neighbours[row].tolist(), scores[row].tolist()), start=1
+            ):
+                if column < 0:
+                    break
+                batch.append(
+                    SimilarRecipe(
+                        recipe_id=recipe_id,
+                        similar_id=int(recipe_ids[column]),
+                        rank=rank,
+                        score=score,
+                    )
+                )
+            if len(batch) >= SIMILAR_BATCH_SIZE:
+                SimilarRecipe.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SimilarRecipe.objects.bulk_create(batch)
+    return total + len(batch)
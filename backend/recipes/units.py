@@ -0,0 +1,147 @@
+from itertools import groupby
+
+GRAM = "г"
+KILOGRAM = "кг"
+MILLILITER = "мл"
+LITER = "л"
+TEASPOON = "ч. л."
+TABLESPOON = "ст. л."
+TO_TASTE = "по вкусу"
+
+# Единицы, которые переводятся друг в друга: базовая единица
+# (г для массы, мл для объема) и количество базовых единиц в одной.
+CONVERTIBLE_UNITS = {
+    GRAM: (GRAM, 1),
+    KILOGRAM: (GRAM, 1000),
+    MILLILITER: (MILLILITER, 1),
+    LITER: (MILLILITER, 1000),
+    TEASPOON: (MILLILITER, 5),
+    TABLESPOON: (MILLILITER, 15),
+    "стакан": (MILLILITER, 250),
+}
+
+# Плотность, г/мл, для ингредиентов, которые указываются и по массе,
+# и по объему. Значения для сыпучих продуктов - по стакану 250 мл
+# без горки.
+DENSITIES = {
+    "вода": 1.0,
+    "молоко": 1.03,
+    "кефир": 1.03,
+    "сметана": 1.0,
+    "сливки": 1.0,
+    "растительное масло": 0.92,
+    "подсолнечное масло": 0.92,
+    "оливковое масло": 0.92,
+    "мед": 1.4,
+    "соевый соус": 1.15,
+    "уксус": 1.01,
+    "сахар": 0.8,
+    "сахарный песок": 0.8,
+    "сахарная пудра": 0.76,
+    "соль": 1.3,
+    "мука": 0.64,
+    "крахмал": 0.8,
+    "манная крупа": 0.8,
+    "рис": 0.9,
+    "какао-порошок": 0.5,
+    "разрыхлитель": 0.8,
+    "пекарский порошок": 0.8,
+}
+
+# Наибольшее число ложек, в котором выводится объем. Больший объем
+# выводится в мл.
+SPOON_DISPLAY_LIMITS = {TABLESPOON: 4, TEASPOON: 2}
+
+
+def format_amount(amount):
+    """Округляет количество до сотых и убирает нулевую дробную часть."""
+    amount = round(amount, 2)
+    return int(amount) if amount == int(amount) else amount
+
+
+def display_unit(unit, amount):
+    """
+    Выбирает единицу вывода для количества в базовой единице.
+
+    Returns:
+        tuple: Единица измерения и количество в ней.
+    """
+    if unit == GRAM and amount >= 1000:
+        return KILOGRAM, amount / 1000
+    if unit == MILLILITER:
+        if amount >= 1000:
+            return LITER, amount / 1000
+        for spoon, limit in SPOON_DISPLAY_LIMITS.items():
+            count = amount / CONVERTIBLE_UNITS[spoon][1]
+            if count <= limit and count == int(count):
+                return spoon, count
+    return unit, amount
+
+
+def merge_lines(name, lines):
+    """
+    Сводит строки одного ингредиента с разными базовыми единицами.
+
+    Объем переводится в массу, если для ингредиента известна плотность
+    и он указан и по массе. Строка "по вкусу" опускается, если у
+    ингредиента есть строки с количеством.
+
+    Args:
+        name (str): Наименование ингредиента.
+        lines (dict): Количество по базовым единицам.
+
+    Returns:
+        dict: Количество по базовым единицам после сведения.
+    """
+    density = DENSITIES.get(name.casefold())
+    if density and GRAM in lines and MILLILITER in lines:
+        lines[GRAM] += lines.pop(MILLILITER) * density
+    if TO_TASTE in lines and len(lines) > 1:
+        del lines[TO_TASTE]
+    return lines
+
+
+def to_base_unit(unit, amount):
+    """
+    Переводит количество в базовую единицу (г или мл).
+
+    Returns:
+        tuple: Базовая единица и количество в ней. Непереводимые
+               единицы возвращаются без изменений.
+    """
+    base, factor = CONVERTIBLE_UNITS.get(unit, (unit, 1))
+    return base, amount * factor
+
+
+def normalize_shopping_list(rows):
+    """
+    Сводит строки списка покупок с учетом единиц измерения.
+
+    Строки должны быть сгруппированы в базе данных по наименованию и
+    единице измерения и упорядочены по наименованию. Строки одного
+    ингредиента переводятся в базовые единицы и сводятся за один проход,
+    в памяти находятся только строки текущего ингредиента.
+
+    Args:
+        rows (Iterable[dict]): Строки с ключами name, measurement_unit
+                               и amount.
+
+    Yields:
+        dict: Строки с ключами name, measurement_unit и amount в единице
+              вывода. Для строк "по вкусу" количество равно None.
+    """
+    for name, group in groupby(rows, key=lambda row: row["name"]):
+        lines = {}
+        for row in group:
+            unit, amount = to_base_unit(
+                row["measurement_unit"], row["amount"]
+            )
+            lines[unit] = lines.get(unit, 0) + amount
+
+        for unit, amount in sorted(merge_lines(name, lines).items()):
+            if unit == TO_TASTE:
+                amount = None
+            else:
+                unit, amount = display_unit(unit, amount)
+                amount = format_amount(amount)
+            yield {"name": name, "measurement_unit": unit, "amount": amount}
@@ -1,4 +1,4 @@
-from django.core.validators import MinValueValidator
+from django.core.validators import MinValueValidator, RegexValidator
 
 
 class CookingTime_Validator:
@@ -22,3 +22,11 @@ class CookingTime_Validator:
 class IngredientAmount_Validator(MinValueValidator):
     limit_value = (1,)
     message = f"Количество не может быть меньше {limit_value}"
+
+
+class SlugValidator(RegexValidator):
+    regex = r"^[-a-zA-Z0-9_]+$"
+    message = (
+        "Слаг может содержать только латинские буквы, цифры, "
+        "дефис и знак подчеркивания."
+    )
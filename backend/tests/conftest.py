@@ -0,0 +1,210 @@
+import pytest
+from django.conf import settings as django_settings
+from django.core.cache import cache
+
+from rest_framework.test import APIClient
+
+from recipes.coverage import recipe_coverage_index
+from recipes.ingredient_index import ingredient_index
+from recipes.memberships import membership_cache
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    SimilarRecipe,
+    Tag,
+)
+from recipes.search import recipe_search_index
+from users.models import Subscription, User
+
+TEST_IMAGE = "recipes_image/test.jpg"
+
+REPLICA_ALIAS = "replica"
+
+INGREDIENTS = (
+    ("абрикосы", "г"),
+    ("авокадо", "шт."),
+    ("молоко", "мл"),
+    ("мука", "г"),
+    ("сахар", "г"),
+    ("соль", "по вкусу"),
+    ("томаты", "г"),
+    ("яйца куриные", "шт."),
+)
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(
+    django_db_modify_db_settings_parallel_suffix,
+):
+    """
+    Добавляет вторую базу SQLite для тестов чтения с реплики. Она не
+    входит в DATABASE_REPLICAS, поэтому остальные тесты ее не видят.
+    """
+    django_settings.DATABASES[REPLICA_ALIAS] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": "replica.sqlite3",
+    }
+
+
+@pytest.fixture(autouse=True)
+def process_caches(settings):
+    """
+    Каждый тест начинается с пустого кэша и пустых индексов процесса:
+    база данных откатывается после теста, а они - нет.
+    """
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    settings.RECIPE_IMAGE_WORKERS = 0
+    cache.clear()
+    for index in (
+        ingredient_index,
+        recipe_search_index,
+        recipe_coverage_index,
+        membership_cache,
+    ):
+        index.__init__()
+
+
+def create_user(username):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="password",
+        first_name="Имя",
+        last_name="Фамилия",
+    )
+
+
+def create_recipe(author, name, tags, amounts, text="Описание."):
+    """
+    Создает рецепт с тегами и ингредиентами.
+
+    Args:
+        amounts (dict): Количество по объектам Ingredient.
+    """
+    recipe = Recipe.objects.create(
+        author=author,
+        name=name,
+        text=text,
+        image=TEST_IMAGE,
+        cooking_time=10,
+    )
+    recipe.tags.set(tags)
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=amount)
+        for ingredient, amount in amounts.items()
+    )
+    return recipe
+
+
+@pytest.fixture
+def make_recipe(db):
+    return create_recipe
+
+
+@pytest.fixture
+def user(db):
+    return create_user("cook")
+
+
+@pytest.fixture
+def author(db):
+    return create_user("author")
+
+
+@pytest.fixture
+def anonymous_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def author_client(author):
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
+
+
+@pytest.fixture
+def tags(db):
+    return [
+        Tag.objects.create(name=name, color=color, slug=slug)
+        for name, color, slug in (
+            ("Завтрак", "#E26C2D", "breakfast"),
+            ("Обед", "#49B64E", "lunch"),
+            ("Ужин", "#8775D2", "dinner"),
+        )
+    ]
+
+
+@pytest.fixture
+def ingredients(db):
+    return [
+        Ingredient.objects.create(name=name, measurement_unit=unit)
+        for name, unit in INGREDIENTS
+    ]
+
+
+@pytest.fixture
+def recipe(author, tags, ingredients):
+    return create_recipe(
+        author,
+        "Омлет",
+        tags[:2],
+        {ingredients[2]: 100, ingredients[7]: 3, ingredients[5]: 1},
+    )
+
+
+@pytest.fixture
+def catalog(user, tags, ingredients, django_capture_on_commit_callbacks):
+    """
+    Наполненная база: 60 рецептов четырех авторов, подписки, избранное,
+    корзина и похожие рецепты пользователя user. Размер выбран так,
+    чтобы страница из 50 элементов была заполнена. Отложенные обработчики
+    сигналов выполняются, чтобы заполнить ленту подписок.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        return create_catalog(user, tags, ingredients)
+
+
+def create_catalog(user, tags, ingredients):
+    authors = [create_user(f"author{number}") for number in range(4)]
+    for author in authors[:3]:
+        Subscription.objects.create(follower=user, author=author)
+
+    recipes = [
+        create_recipe(
+            authors[number % len(authors)],
+            f"Рецепт {number}",
+            tags[number % 3:] or tags,
+            {
+                ingredient: 10 + number
+                for ingredient in ingredients[number % 4:number % 4 + 4]
+            },
+        )
+        for number in range(60)
+    ]
+    for other in authors + [user]:
+        Favorite.objects.create(user=other, recipe=recipes[0])
+    for recipe in recipes[:10]:
+        Favorite.objects.get_or_create(user=user, recipe=recipe)
+        ShoppingCart.objects.create(user=user, recipe=recipe)
+    SimilarRecipe.objects.bulk_create(
+        SimilarRecipe(
+            recipe=recipes[0], similar=similar, rank=rank, score=1 / rank
+        )
+        for rank, similar in enumerate(recipes[1:51], start=1)
+    )
+    return recipes
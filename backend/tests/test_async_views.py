@@ -0,0 +1,143 @@
+import asyncio
+import importlib
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.core.asgi import get_asgi_application
+from django.db import connections
+from django.test import AsyncClient
+from django.urls import clear_url_caches
+
+from rest_framework.authtoken.models import Token
+
+from api import async_views, urls
+from api.middleware import QueryInstrumentationMiddleware, count_request_query
+from recipes.models import ShoppingCart
+
+
+@pytest.fixture
+def async_urls(settings):
+    """Подключает асинхронные маршруты, как это делает foodgram/asgi.py."""
+    settings.ASYNC_READ_VIEWS = True
+    importlib.reload(urls)
+    clear_url_caches()
+    yield
+    settings.ASYNC_READ_VIEWS = False
+    importlib.reload(urls)
+    clear_url_caches()
+
+
+def asgi_get(path, query_string="", token=None):
+    """
+    Выполняет GET-запрос к ASGI-приложению так же, как сервер uvicorn:
+    тело ответа, в том числе потокового, читается в цикле событий.
+
+    Returns:
+        tuple: Код ответа и тело ответа (bytes).
+    """
+    headers = [(b"host", b"testserver")]
+    if token is not None:
+        headers.append((b"authorization", f"Token {token.key}".encode()))
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query_string.encode(),
+        "headers": headers,
+    }
+
+    async def request():
+        communicator = ApplicationCommunicator(get_asgi_application(), scope)
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output()
+        body = b""
+        more_body = True
+        while more_body:
+            message = await communicator.receive_output()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        return start["status"], body
+
+    return async_to_sync(request)()
+
+
+def test_instrumentation_middleware_is_async_capable(settings):
+    settings.QUERY_INSTRUMENTATION = True
+
+    async def get_response(request):
+        pass
+
+    def get_response_sync(request):
+        pass
+
+    assert asyncio.iscoroutinefunction(
+        QueryInstrumentationMiddleware(get_response)
+    )
+    assert not asyncio.iscoroutinefunction(
+        QueryInstrumentationMiddleware(get_response_sync)
+    )
+
+
+# Асинхронные представления работают в собственных потоках со своими
+# соединениями, которым не видны данные незавершенной транзакции теста.
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    "path",
+    ("/api/recipes/{recipe_id}/", "/api/recipes/{recipe_id}/similar/"),
+    ids=("async view", "sync view"),
+)
+def test_async_routes_report_queries(settings, async_urls, recipe, path):
+    settings.QUERY_INSTRUMENTATION = True
+
+    response = async_to_sync(AsyncClient().get)(
+        path.format(recipe_id=recipe.id)
+    )
+
+    assert response.status_code == 200
+    assert int(response["X-DB-Queries"]) > 0
+    # Учет подключается к соединениям только на время запроса.
+    assert not any(
+        count_request_query in connection.execute_wrappers
+        for connection in connections.all()
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_routes_keep_writes_synchronous(
+    settings, monkeypatch, async_urls, recipe, author
+):
+    settings.QUERY_INSTRUMENTATION = True
+
+    def get_executor():
+        raise AssertionError("запись выполнена в пуле чтения")
+
+    monkeypatch.setattr(async_views, "get_executor", get_executor)
+    token = Token.objects.create(user=author)
+
+    response = async_to_sync(AsyncClient().patch)(
+        f"/api/recipes/{recipe.id}/",
+        {"name": "Омлет с сыром"},
+        content_type="application/json",
+        authorization=f"Token {token.key}",
+    )
+
+    assert response.status_code == 200, response.content
+    assert int(response["X-DB-Queries"]) > 0
+    recipe.refresh_from_db()
+    assert recipe.name == "Омлет с сыром"
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("file_format", ("txt", "csv", "json"))
+def test_download_shopping_cart_under_asgi(user, recipe, file_format):
+    ShoppingCart.objects.create(user=user, recipe=recipe)
+
+    status, body = asgi_get(
+        "/api/recipes/download_shopping_cart/",
+        f"format={file_format}",
+        token=Token.objects.create(user=user),
+    )
+
+    assert status == 200
+    assert "молоко" in body.decode()
@@ -0,0 +1,129 @@
+import base64
+import io
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+pytestmark = pytest.mark.django_db
+
+RECIPES_URL = "/api/recipes/"
+MISSING_ID = 999999
+DOES_NOT_EXIST = (
+    f'Недопустимый первичный ключ "{MISSING_ID}" - объект не существует.'
+)
+
+# Запросы создания рецепта: по одному на проверку ингредиентов, тегов и
+# уникальности названия, точки сохранения, вставки рецепта, счетчика и
+# связей, и ответ с рецептом (включая загрузку множеств пользователя).
+CREATE_QUERY_BUDGET = 16
+
+
+@pytest.fixture
+def image(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    buffer = io.BytesIO()
+    Image.new("RGB", (1, 1)).save(buffer, "PNG")
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f"data:image/png;base64,{encoded}"
+
+
+@pytest.fixture
+def payload(image):
+    def payload(name, ingredients, tags):
+        return {
+            "name": name,
+            "text": "Описание.",
+            "cooking_time": 5,
+            "image": image,
+            "ingredients": [
+                {"id": ingredient_id, "amount": 10}
+                for ingredient_id in ingredients
+            ],
+            "tags": tags,
+        }
+
+    return payload
+
+
+def create_recipe(client, data):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(RECIPES_URL, data, format="json")
+    return response, len(queries)
+
+
+def test_missing_ingredient_reported_at_its_position(
+    author_client, payload, tags, ingredients
+):
+    response, _ = create_recipe(
+        author_client,
+        payload(
+            "Омлет",
+            [ingredients[0].id, MISSING_ID, ingredients[1].id],
+            [tags[0].id],
+        ),
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "ingredients": [{}, {"id": [DOES_NOT_EXIST]}, {}]
+    }
+
+
+def test_missing_tag_reported_at_its_position(
+    author_client, payload, tags, ingredients
+):
+    response, _ = create_recipe(
+        author_client,
+        payload("Омлет", [ingredients[0].id], [tags[0].id, MISSING_ID]),
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"tags": {"1": [DOES_NOT_EXIST]}}
+
+
+def test_invalid_tag_type(author_client, payload, tags, ingredients):
+    response, _ = create_recipe(
+        author_client,
+        payload("Омлет", [ingredients[0].id], ["завтрак", tags[0].id]),
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "tags": {
+            "0": [
+                "Некорректный тип. Ожидалось значение первичного ключа, "
+                "получен str."
+            ]
+        }
+    }
+
+
+def test_create_queries_do_not_depend_on_relations(
+    author_client, payload, tags, ingredients
+):
+    first, queries = create_recipe(
+        author_client,
+        payload("Омлет", [ingredients[0].id], [tags[0].id]),
+    )
+    assert first.status_code == 201, first.data
+    assert queries <= CREATE_QUERY_BUDGET
+
+    # Множества пользователя уже в кэше: дальше считаются только
+    # проверка и запись рецепта.
+    counts = []
+    for name, size in (("Блины", 1), ("Сырники", len(ingredients))):
+        response, queries = create_recipe(
+            author_client,
+            payload(
+                name,
+                [ingredient.id for ingredient in ingredients[:size]],
+                [tag.id for tag in tags[:size]],
+            ),
+        )
+        assert response.status_code == 201, response.data
+        assert len(response.json()["ingredients"]) == size
+        counts.append(queries)
+
+    assert counts[0] == counts[1]
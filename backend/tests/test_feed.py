@@ -0,0 +1,114 @@
+import pytest
+
+from recipes.feed import rebuild_feeds
+from recipes.models import FeedEntry
+from users.models import Subscription
+
+FEED_URL = "/api/recipes/feed/"
+
+
+@pytest.fixture
+def publish(
+    make_recipe, tags, ingredients, django_capture_on_commit_callbacks
+):
+    """Создает рецепт и выполняет обработчики после фиксации."""
+
+    def publish(author, name):
+        with django_capture_on_commit_callbacks(execute=True):
+            return make_recipe(author, name, tags[:1], {ingredients[0]: 10})
+
+    return publish
+
+
+def feed_ids(user):
+    return list(
+        FeedEntry.objects.filter(follower=user)
+        .order_by("-pub_date", "-recipe_id")
+        .values_list("recipe_id", flat=True)
+    )
+
+
+def test_new_recipe_fans_out_after_commit(
+    user, author, make_recipe, tags, ingredients,
+    django_capture_on_commit_callbacks,
+):
+    Subscription.objects.create(follower=user, author=author)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        recipe = make_recipe(author, "Омлет", tags[:1], {ingredients[0]: 10})
+        assert not FeedEntry.objects.exists()
+    for callback in callbacks:
+        callback()
+
+    assert feed_ids(user) == [recipe.id]
+    assert feed_ids(author) == []
+
+
+def test_subscribe_backfills_latest_recipes(
+    settings, user, author, user_client, publish
+):
+    settings.FEED_BACKFILL_LIMIT = 2
+    recipes = [publish(author, f"Рецепт {number}") for number in range(3)]
+
+    response = user_client.post(f"/api/users/{author.id}/subscribe/")
+
+    assert response.status_code == 201
+    assert feed_ids(user) == [recipes[2].id, recipes[1].id]
+
+
+def test_unsubscribe_prunes_feed(user, author, user_client, publish):
+    Subscription.objects.create(follower=user, author=author)
+    publish(author, "Омлет")
+
+    response = user_client.delete(f"/api/users/{author.id}/subscribe/")
+
+    assert response.status_code == 204
+    assert feed_ids(user) == []
+
+
+def test_deleted_recipe_leaves_feed(user, author, author_client, publish):
+    Subscription.objects.create(follower=user, author=author)
+    recipe = publish(author, "Омлет")
+
+    response = author_client.delete(f"/api/recipes/{recipe.id}/")
+
+    assert response.status_code == 204
+    assert feed_ids(user) == []
+
+
+def test_rebuild_feeds_applies_backfill_limit(settings, user, author, publish):
+    other = type(author).objects.create_user(
+        username="other", email="other@example.com", password="password"
+    )
+    recipes = [publish(author, f"Рецепт {number}") for number in range(3)]
+    other_recipe = publish(other, "Суп")
+    Subscription.objects.create(follower=user, author=author)
+    Subscription.objects.create(follower=user, author=other)
+    Subscription.objects.create(follower=other, author=author)
+    settings.FEED_BACKFILL_LIMIT = 2
+
+    assert rebuild_feeds() == 5
+    assert feed_ids(user) == [
+        other_recipe.id, recipes[2].id, recipes[1].id
+    ]
+    assert feed_ids(other) == [recipes[2].id, recipes[1].id]
+
+
+def test_feed_endpoint(user, author, user_client, publish):
+    Subscription.objects.create(follower=user, author=author)
+    recipes = [publish(author, f"Рецепт {number}") for number in range(3)]
+    publish(user, "Свой рецепт")
+
+    response = user_client.get(FEED_URL, {"limit": 2})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert [item["id"] for item in data["results"]] == [
+        recipes[2].id, recipes[1].id
+    ]
+    assert data["results"][0]["author"]["id"] == author.id
+
+
+def test_feed_requires_authentication(anonymous_client):
+    assert anonymous_client.get(FEED_URL).status_code == 401
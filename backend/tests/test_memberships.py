@@ -0,0 +1,72 @@
+import pytest
+
+from recipes.memberships import FAVORITES, SHOPPING_CART, membership_cache
+from recipes.models import Favorite
+
+pytestmark = pytest.mark.django_db
+
+
+def get_flags(client, recipe):
+    data = client.get(f"/api/recipes/{recipe.id}/").json()
+    return data["is_favorited"], data["is_in_shopping_cart"]
+
+
+def test_flags_follow_changes(
+    user_client, recipe, django_capture_on_commit_callbacks
+):
+    assert get_flags(user_client, recipe) == (False, False)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post(f"/api/recipes/{recipe.id}/favorite/")
+        user_client.post(
+            "/api/recipes/shopping_cart/",
+            {"recipes": [recipe.id]},
+            format="json",
+        )
+    assert get_flags(user_client, recipe) == (True, True)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.delete(f"/api/recipes/{recipe.id}/favorite/")
+        user_client.delete(
+            "/api/recipes/shopping_cart/",
+            {"recipes": [recipe.id]},
+            format="json",
+        )
+    assert get_flags(user_client, recipe) == (False, False)
+
+
+def test_change_with_colliding_version_is_not_lost(
+    user, recipe, make_recipe, ingredients
+):
+    other = make_recipe(recipe.author, "Каша", [], {ingredients[2]: 200})
+    assert membership_cache.get(user)[FAVORITES] == frozenset()
+
+    # Два процесса добавили по рецепту, и неатомарный cache.incr выдал
+    # обоим одну и ту же новую версию: изменение первого процесса
+    # версию не увеличило.
+    Favorite.objects.create(user=user, recipe=recipe)
+    Favorite.objects.create(user=user, recipe=other)
+    membership_cache.invalidate(user.pk)
+
+    memberships = membership_cache.get(user)
+    assert memberships[FAVORITES] == {recipe.id, other.id}
+    assert memberships[SHOPPING_CART] == frozenset()
+
+
+def test_bulk_change_keeps_counters(
+    user_client, user, recipe, make_recipe, ingredients
+):
+    other = make_recipe(recipe.author, "Каша", [], {ingredients[2]: 200})
+    Favorite.objects.create(user=user, recipe=recipe)
+    payload = {"recipes": [recipe.id, other.id]}
+
+    user_client.post("/api/recipes/favorite/", payload, format="json")
+    recipe.refresh_from_db()
+    other.refresh_from_db()
+    assert (recipe.favorites_count, other.favorites_count) == (1, 1)
+
+    user_client.delete("/api/recipes/favorite/", payload, format="json")
+    recipe.refresh_from_db()
+    other.refresh_from_db()
+    assert (recipe.favorites_count, other.favorites_count) == (0, 0)
+    assert not Favorite.objects.filter(user=user).exists()
@@ -0,0 +1,40 @@
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+
+def test_cursor_pagination_follows_publication_order(user_client, catalog):
+    response = user_client.get(
+        "/api/recipes/", {"pagination": "cursor", "limit": 40}
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    assert "count" not in data
+    assert [item["id"] for item in data["results"]] == [
+        recipe.id for recipe in reversed(catalog)
+    ][:40]
+
+    data = user_client.get(data["next"]).json()
+    assert [item["id"] for item in data["results"]] == [
+        recipe.id for recipe in reversed(catalog)
+    ][40:]
+    assert data["next"] is None
+
+
+@pytest.mark.parametrize(
+    "params",
+    (
+        {"pagination": "cursor", "search": "рецепт"},
+        {"pagination": "cursor", "ingredients": "1,2", "max_missing": 1},
+        {"search": "рецепт", "cursor": "cD0yMDI2"},
+    ),
+    ids=("search", "ingredients", "cursor link"),
+)
+def test_cursor_pagination_rejected_with_ranked_filters(
+    user_client, catalog, params
+):
+    response = user_client.get("/api/recipes/", params)
+
+    assert response.status_code == 400
+    assert "pagination" in response.json()
@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.test import APIClient
+
+PAGE_SIZES = (1, 50)
+
+# Максимальное число SQL-запросов на GET-запрос к эндпоинту. Для списков
+# число запросов не должно зависеть от размера страницы.
+QUERY_BUDGETS = {
+    "/api/recipes/": 5,
+    "/api/recipes/{recipe_id}/": 4,
+    "/api/users/": 2,
+    "/api/users/{user_id}/": 1,
+    "/api/users/me/": 1,
+    "/api/users/subscriptions/": 3,
+    "/api/recipes/feed/": 6,
+    "/api/recipes/{recipe_id}/similar/": 4,
+    "/api/recipes/?ingredients={ingredient_ids}&max_missing=2": 5,
+    "/api/tags/": 1,
+    "/api/tags/{tag_id}/": 1,
+    "/api/ingredients/": 1,
+    "/api/ingredients/?name=а": 2,
+    "/api/ingredients/{ingredient_id}/": 1,
+    "/api/recipes/download_shopping_cart/": 1,
+}
+
+# Эндпоинты, доступные только аутентифицированному пользователю.
+PRIVATE_ENDPOINTS = {
+    "/api/users/{user_id}/",
+    "/api/users/me/",
+    "/api/users/subscriptions/",
+    "/api/recipes/feed/",
+    "/api/recipes/download_shopping_cart/",
+}
+
+CASES = [
+    (client_name, path)
+    for path in QUERY_BUDGETS
+    for client_name in ("anonymous", "user")
+    if client_name == "user" or path not in PRIVATE_ENDPOINTS
+]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+        if response.streaming:
+            b"".join(response.streaming_content)
+    assert response.status_code == 200, (url, response.status_code)
+    return len(context.captured_queries)
+
+
+@pytest.mark.parametrize("client_name, path", CASES)
+def test_query_budget(
+    client_name, path, catalog, user, anonymous_client, user_client
+):
+    recipe = catalog[0]
+    ingredient_ids = list(
+        recipe.recipe_ingredients.values_list("ingredient_id", flat=True)
+    )
+    url = path.format(
+        recipe_id=recipe.id,
+        user_id=user.id,
+        tag_id=recipe.tags.values_list("id", flat=True).first(),
+        ingredient_id=ingredient_ids[0],
+        ingredient_ids=",".join(map(str, ingredient_ids)),
+    )
+    client = user_client if client_name == "user" else anonymous_client
+    separator = "&" if "?" in url else "?"
+
+    # Первый запрос прогревает индексы и кэши процесса.
+    client.get(url)
+    counts = [
+        count_queries(client, f"{url}{separator}limit={page_size}")
+        for page_size in PAGE_SIZES
+    ]
+
+    assert max(counts) <= QUERY_BUDGETS[path], counts
+    assert len(set(counts)) == 1, counts
+
+
+@pytest.mark.django_db
+def test_query_instrumentation_headers(settings, recipe):
+    settings.QUERY_INSTRUMENTATION = True
+
+    response = APIClient().get(f"/api/recipes/{recipe.id}/")
+
+    assert int(response["X-DB-Queries"]) > 0
+    assert response["Server-Timing"].startswith("db;dur=")
+
+
+@pytest.mark.django_db
+def test_query_instrumentation_disabled(settings, recipe):
+    settings.QUERY_INSTRUMENTATION = False
+
+    response = APIClient().get(f"/api/recipes/{recipe.id}/")
+
+    assert "X-DB-Queries" not in response
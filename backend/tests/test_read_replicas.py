@@ -0,0 +1,70 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Favorite
+from tests.conftest import REPLICA_ALIAS
+
+pytestmark = pytest.mark.django_db(databases=["default", REPLICA_ALIAS])
+
+USERS_URL = "/api/users/"
+
+
+@pytest.fixture(autouse=True)
+def replica_settings(settings):
+    """
+    Реплика - отдельная пустая база: ответ, собранный на ней, не видит
+    пользователей и рецептов, созданных тестом в основной базе.
+    """
+    settings.DATABASE_REPLICAS = [REPLICA_ALIAS]
+    settings.DATABASE_ROUTERS = ["foodgram.routers.ReadReplicaRouter"]
+
+
+def list_users(client):
+    with CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+        response = client.get(USERS_URL)
+    assert response.status_code == 200
+    return response.json()["count"], len(replica.captured_queries)
+
+
+def test_safe_read_goes_to_replica(user_client):
+    count, replica_queries = list_users(user_client)
+
+    assert count == 0
+    assert replica_queries > 0
+
+
+def test_write_pins_user_to_default(user, user_client, recipe):
+    with CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+        response = user_client.post(f"/api/recipes/{recipe.id}/favorite/")
+
+    assert response.status_code == 201
+    assert not replica.captured_queries
+    assert Favorite.objects.using("default").filter(
+        user=user, recipe=recipe
+    ).exists()
+
+    count, replica_queries = list_users(user_client)
+
+    assert count > 0
+    assert replica_queries == 0
+
+
+def test_pin_is_per_user(user_client, author_client, recipe):
+    response = user_client.post(f"/api/recipes/{recipe.id}/favorite/")
+    assert response.status_code == 201
+
+    count, replica_queries = list_users(author_client)
+
+    assert count == 0
+    assert replica_queries > 0
+
+
+def test_failed_write_does_not_pin(user_client):
+    response = user_client.post("/api/recipes/0/favorite/")
+    assert response.status_code == 404
+
+    count, replica_queries = list_users(user_client)
+
+    assert count == 0
+    assert replica_queries > 0
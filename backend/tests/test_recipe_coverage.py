@@ -0,0 +1,96 @@
+import pytest
+
+from recipes.coverage import invalidate_coverage, recipe_coverage_index
+
+pytestmark = pytest.mark.django_db
+
+
+def get_coverage(client, ingredients, **params):
+    params["ingredients"] = ",".join(str(item.id) for item in ingredients)
+    params.setdefault("limit", 100)
+    response = client.get("/api/recipes/", params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_ranked_by_missing_ingredients(
+    anonymous_client, make_recipe, recipe, ingredients
+):
+    author, tags = recipe.author, list(recipe.tags.all())
+    full = make_recipe(
+        author,
+        "Молоко с сахаром",
+        tags,
+        {ingredients[2]: 200, ingredients[4]: 10},
+    )
+    far = make_recipe(
+        author,
+        "Пирог",
+        tags,
+        {ingredients[3]: 300, ingredients[4]: 100, ingredients[7]: 2},
+    )
+
+    data = get_coverage(anonymous_client, ingredients[2:5], max_missing=2)
+
+    # Омлету недостает яиц и соли, пирогу - яиц.
+    assert [item["id"] for item in data["results"]] == [
+        full.id,
+        far.id,
+        recipe.id,
+    ]
+    data = get_coverage(anonymous_client, ingredients[2:5])
+    assert [item["id"] for item in data["results"]] == [full.id]
+
+
+def test_limit_applies_after_other_filters(
+    settings, user_client, catalog, ingredients, tags
+):
+    # Подходят все 60 рецептов, тег breakfast есть у каждого третьего.
+    expected = [
+        recipe.id
+        for recipe in reversed(catalog)
+        if tags[0] in recipe.tags.all()
+    ]
+
+    data = get_coverage(user_client, ingredients, tags="breakfast")
+    assert data["count"] == len(expected) == 20
+
+    settings.RECIPE_COVERAGE_LIMIT = 5
+    data = get_coverage(user_client, ingredients, tags="breakfast")
+
+    assert data["count"] == 5
+    assert [item["id"] for item in data["results"]] == expected[:5]
+
+
+def test_index_follows_composition_changes(
+    anonymous_client, recipe, ingredients, django_capture_on_commit_callbacks
+):
+    milk = ingredients[2:3]
+    assert get_coverage(anonymous_client, milk, max_missing=2)["count"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.recipe_ingredients.filter(ingredient=ingredients[2]).delete()
+        recipe.save()
+    assert get_coverage(anonymous_client, milk, max_missing=2)["count"] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.delete()
+    assert get_coverage(anonymous_client, ingredients[7:])["count"] == 0
+
+
+def test_changes_with_colliding_version_are_not_lost(
+    recipe, make_recipe, ingredients
+):
+    author, tags = recipe.author, list(recipe.tags.all())
+    assert recipe_coverage_index.coverage([ingredients[0].id]) == []
+
+    # Два процесса изменили составы, и неатомарный cache.incr выдал обоим
+    # одну и ту же новую версию.
+    first = make_recipe(author, "Компот", tags, {ingredients[0]: 100})
+    second = make_recipe(author, "Джем", tags, {ingredients[0]: 500})
+    invalidate_coverage()
+
+    assert recipe_coverage_index.coverage([ingredients[0].id]) == [
+        (0, second.id),
+        (0, first.id),
+    ]
@@ -0,0 +1,57 @@
+import io
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from recipes import images
+from recipes.images import process_recipe_image
+from recipes.models import Recipe
+
+
+@pytest.fixture
+def pending_recipe(settings, tmp_path, recipe):
+    """Рецепт с загруженным, но еще не обработанным изображением."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), "red").save(buffer, format="BMP")
+    recipe.image = default_storage.save(
+        "recipes_image/raw.bmp", ContentFile(buffer.getvalue())
+    )
+    recipe.image_status = Recipe.IMAGE_PENDING
+    recipe.save(update_fields=["image", "image_status"])
+    return recipe
+
+
+def test_process_recipe_image(pending_recipe):
+    process_recipe_image(pending_recipe.id)
+
+    pending_recipe.refresh_from_db()
+    assert pending_recipe.image_status == Recipe.IMAGE_READY
+    assert pending_recipe.image.name == "recipes_image/raw.jpg"
+    assert default_storage.exists("recipes_image/raw.jpg")
+    assert not default_storage.exists("recipes_image/raw.bmp")
+
+
+def test_process_recipe_image_replaced_during_processing(
+    monkeypatch, pending_recipe
+):
+    reencode_image = images.reencode_image
+
+    def reencode_and_replace(raw_file):
+        # Пока изображение обрабатывается, автор загружает новое.
+        Recipe.objects.filter(pk=pending_recipe.id).update(
+            image="recipes_image/new.png"
+        )
+        return reencode_image(raw_file)
+
+    monkeypatch.setattr(images, "reencode_image", reencode_and_replace)
+
+    process_recipe_image(pending_recipe.id)
+
+    pending_recipe.refresh_from_db()
+    assert pending_recipe.image.name == "recipes_image/new.png"
+    assert pending_recipe.image_status == Recipe.IMAGE_PENDING
+    assert not default_storage.exists("recipes_image/raw.jpg")
+    assert default_storage.exists("recipes_image/raw.bmp")
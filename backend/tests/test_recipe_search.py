@@ -0,0 +1,135 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from recipes.models import Recipe
+from recipes.search import stem, tokenize, uses_postgres_search
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def make_searchable_recipe(make_recipe, django_capture_on_commit_callbacks):
+    """
+    Создает рецепт и выполняет отложенные до фиксации транзакции
+    обработчики: без них поисковый вектор PostgreSQL не заполняется.
+    """
+
+    def make(*args, **kwargs):
+        with django_capture_on_commit_callbacks(execute=True):
+            return make_recipe(*args, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def recipe(make_searchable_recipe, author, tags, ingredients):
+    return make_searchable_recipe(
+        author,
+        "Омлет",
+        tags[:2],
+        {ingredients[2]: 100, ingredients[7]: 3, ingredients[5]: 1},
+    )
+
+
+def search(client, query):
+    response = client.get("/api/recipes/", {"search": query})
+    assert response.status_code == 200
+    return [recipe["name"] for recipe in response.json()["results"]]
+
+
+def test_stem():
+    assert stem("омлеты") == stem("омлетом") == "омлет"
+    assert stem("ёжики") == stem("ежик")
+    # Короткие слова не укорачиваются до неузнаваемости.
+    assert stem("суп") == "суп"
+    assert tokenize("Блины, С МОЛОКОМ!") == ["блин", "с", "молок"]
+
+
+def test_search_matches_word_forms(anonymous_client, recipe):
+    assert search(anonymous_client, "омлеты") == ["Омлет"]
+    assert search(anonymous_client, "молоком") == ["Омлет"]
+    assert search(anonymous_client, "омлет томаты") == []
+
+
+def test_search_ranks_name_over_ingredients_and_text(
+    anonymous_client, author, tags, ingredients, make_searchable_recipe
+):
+    make_searchable_recipe(
+        author, "Каша", tags, {ingredients[3]: 100}, text="Как у бабушки."
+    )
+    make_searchable_recipe(author, "Пирог", tags, {ingredients[1]: 1})
+    make_searchable_recipe(author, "Смузи", tags, {ingredients[0]: 100})
+    make_searchable_recipe(
+        author, "Тост", tags, {ingredients[3]: 50}, text="С авокадо."
+    )
+    make_searchable_recipe(
+        author, "Авокадо на гриле", tags, {ingredients[4]: 5}
+    )
+
+    assert search(anonymous_client, "авокадо") == [
+        "Авокадо на гриле",
+        "Пирог",
+        "Тост",
+    ]
+
+
+def test_fallback_limit_applies_after_other_filters(
+    settings, user_client, author, tags, ingredients, make_recipe
+):
+    if uses_postgres_search():
+        pytest.skip("ограничение есть только у запасного индекса")
+    settings.RECIPE_SEARCH_FALLBACK_LIMIT = 2
+    # При равной релевантности новые рецепты идут первыми.
+    for number in range(2):
+        make_recipe(author, f"Каша {number}", tags[2:], {ingredients[3]: 1})
+    for number in range(2, 6):
+        make_recipe(author, f"Каша {number}", tags[:1], {ingredients[3]: 1})
+
+    response = user_client.get(
+        "/api/recipes/", {"search": "каша", "tags": "dinner"}
+    )
+
+    assert [recipe["name"] for recipe in response.json()["results"]] == [
+        "Каша 1",
+        "Каша 0",
+    ]
+
+
+def test_search_follows_save_and_delete(
+    anonymous_client, recipe, django_capture_on_commit_callbacks
+):
+    assert search(anonymous_client, "омлет") == ["Омлет"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.name = "Фриттата"
+        recipe.save()
+    assert search(anonymous_client, "омлет") == []
+    assert search(anonymous_client, "фриттата") == ["Фриттата"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.delete()
+    assert search(anonymous_client, "фриттата") == []
+
+
+def test_seeded_recipes_are_searchable(
+    settings, tmp_path, user_client, ingredients,
+    django_capture_on_commit_callbacks,
+):
+    settings.MEDIA_ROOT = str(tmp_path)
+    assert search(user_client, "рецепт") == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command(
+            "seed_foodgram",
+            users=3,
+            recipes=5,
+            subscriptions_per_user=1,
+            favorites_per_user=1,
+            cart_per_user=1,
+            ingredients_per_recipe=2,
+            stdout=io.StringIO(),
+        )
+
+    assert len(search(user_client, "рецепт")) == Recipe.objects.count()
@@ -0,0 +1,154 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.django_db
+
+RECIPE_RELATION_TABLES = ("recipes_recipeingredient", "recipes_recipe_tags")
+
+
+class WriteCounter:
+    """
+    Обертка для connection.execute_wrapper, запоминающая вид (INSERT,
+    UPDATE или DELETE) изменяющих запросов к таблицам связей рецепта.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = sql.lstrip().upper()
+        if statement.startswith(("INSERT", "UPDATE", "DELETE")) and any(
+            table in sql for table in RECIPE_RELATION_TABLES
+        ):
+            self.statements.append(statement.split(None, 1)[0])
+        return execute(sql, params, many, context)
+
+
+def get_payload(recipe):
+    return {
+        "ingredients": [
+            {"id": row.ingredient_id, "amount": row.amount}
+            for row in recipe.recipe_ingredients.order_by("id")
+        ],
+        "tags": list(recipe.tags.order_by("id").values_list("id", flat=True)),
+    }
+
+
+def get_rows(recipe):
+    return {
+        row.ingredient_id: (row.pk, row.amount)
+        for row in recipe.recipe_ingredients.all()
+    }
+
+
+def patch_recipe(client, recipe, data):
+    counter = WriteCounter()
+    with CaptureQueriesContext(connection) as queries:
+        with connection.execute_wrapper(counter):
+            response = client.patch(
+                f"/api/recipes/{recipe.id}/", data, format="json"
+            )
+    assert response.status_code == 200, response.data
+    return counter, len(queries)
+
+
+# Запросы PATCH-запроса с одной записью в таблицы связей, вместе с
+# проверкой тегов и ингредиентов, точками сохранения транзакции и
+# ответом с рецептом (включая загрузку множеств пользователя).
+PATCH_QUERY_BUDGET = 15
+
+
+def test_unchanged_data_writes_nothing(author_client, recipe):
+    rows = get_rows(recipe)
+
+    counter, queries = patch_recipe(author_client, recipe, get_payload(recipe))
+
+    assert counter.statements == []
+    assert queries <= PATCH_QUERY_BUDGET
+    assert get_rows(recipe) == rows
+
+
+def test_one_changed_amount_is_one_update(author_client, recipe, ingredients):
+    rows = get_rows(recipe)
+    payload = get_payload(recipe)
+    for item in payload["ingredients"]:
+        if item["id"] == ingredients[2].id:
+            item["amount"] = 250
+
+    counter, queries = patch_recipe(author_client, recipe, payload)
+
+    assert counter.statements == ["UPDATE"]
+    assert queries <= PATCH_QUERY_BUDGET
+    rows[ingredients[2].id] = (rows[ingredients[2].id][0], 250)
+    assert get_rows(recipe) == rows
+
+
+def test_removed_and_added_ingredients(author_client, recipe, ingredients):
+    rows = get_rows(recipe)
+    payload = get_payload(recipe)
+    payload["ingredients"] = [
+        item
+        for item in payload["ingredients"]
+        if item["id"] != ingredients[7].id
+    ] + [{"id": ingredients[0].id, "amount": 40}]
+
+    counter, _ = patch_recipe(author_client, recipe, payload)
+
+    assert sorted(counter.statements) == ["DELETE", "INSERT"]
+    new_rows = get_rows(recipe)
+    assert set(new_rows) == {
+        ingredients[0].id,
+        ingredients[2].id,
+        ingredients[5].id,
+    }
+    assert new_rows[ingredients[0].id][1] == 40
+    # Оставшиеся строки не пересоздаются.
+    for ingredient in (ingredients[2], ingredients[5]):
+        assert new_rows[ingredient.id] == rows[ingredient.id]
+
+
+def test_duplicate_ingredients_are_merged(author_client, recipe, ingredients):
+    payload = get_payload(recipe)
+    payload["ingredients"] = [
+        {"id": ingredients[2].id, "amount": 70},
+        {"id": ingredients[7].id, "amount": 3},
+        {"id": ingredients[2].id, "amount": 50},
+        {"id": ingredients[5].id, "amount": 1},
+    ]
+
+    counter, _ = patch_recipe(author_client, recipe, payload)
+
+    assert counter.statements == ["UPDATE"]
+    assert recipe.recipe_ingredients.filter(
+        ingredient=ingredients[2]
+    ).count() == 1
+    assert get_rows(recipe)[ingredients[2].id][1] == 120
+
+
+def test_changed_tag_replaces_one_row(author_client, recipe, tags):
+    payload = get_payload(recipe)
+    payload["tags"] = [tags[0].id, tags[2].id]
+
+    counter, _ = patch_recipe(author_client, recipe, payload)
+
+    assert sorted(counter.statements) == ["DELETE", "INSERT"]
+    assert set(recipe.tags.values_list("id", flat=True)) == {
+        tags[0].id,
+        tags[2].id,
+    }
+
+
+def test_patch_without_relations_keeps_them(author_client, recipe):
+    rows = get_rows(recipe)
+    tag_ids = set(recipe.tags.values_list("id", flat=True))
+
+    counter, _ = patch_recipe(
+        author_client, recipe, {"name": "Омлет с зеленью"}
+    )
+
+    assert counter.statements == []
+    recipe.refresh_from_db()
+    assert recipe.name == "Омлет с зеленью"
+    assert get_rows(recipe) == rows
+    assert set(recipe.tags.values_list("id", flat=True)) == tag_ids
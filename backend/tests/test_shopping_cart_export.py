@@ -0,0 +1,66 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from api import renderers
+from api.checks import check_shopping_cart_pdf_font
+from recipes.models import ShoppingCart
+
+URL = "/api/recipes/download_shopping_cart/?format=pdf"
+
+requires_reportlab = pytest.mark.skipif(
+    not renderers.REPORTLAB_INSTALLED, reason="reportlab не установлен"
+)
+
+
+@pytest.fixture
+def cart(user, recipe):
+    ShoppingCart.objects.create(user=user, recipe=recipe)
+
+
+@requires_reportlab
+def test_pdf_shopping_cart_uses_cyrillic_font(cart, user_client):
+    response = user_client.get(URL)
+    content = b"".join(response.streaming_content)
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/pdf"
+    assert content.startswith(b"%PDF")
+    assert b"DejaVuSans" in content
+
+
+@requires_reportlab
+def test_pdf_shopping_cart_without_font_fails(
+    settings, monkeypatch, cart, user_client
+):
+    settings.SHOPPING_CART_PDF_FONT = "/nonexistent/font.ttf"
+    monkeypatch.setattr(
+        renderers.PDFShoppingCartRenderer, "font_name", "MissingFont"
+    )
+
+    with pytest.raises(ImproperlyConfigured):
+        user_client.get(URL)
+
+
+@requires_reportlab
+def test_pdf_font_check(settings):
+    assert check_shopping_cart_pdf_font(None) == []
+
+    settings.SHOPPING_CART_PDF_FONT = "/nonexistent/font.ttf"
+
+    assert [error.id for error in check_shopping_cart_pdf_font(None)] == [
+        "api.W001"
+    ]
+
+
+def test_ndjson_shopping_cart_by_accept_header(cart, user_client):
+    response = user_client.get(
+        "/api/recipes/download_shopping_cart/",
+        HTTP_ACCEPT="application/x-ndjson",
+    )
+    lines = b"".join(response.streaming_content).decode().splitlines()
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("application/x-ndjson")
+    assert '{"name": "молоко", "measurement_unit": "мл", "amount": 100}' in (
+        lines
+    )
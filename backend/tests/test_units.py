@@ -0,0 +1,133 @@
+import pytest
+
+from recipes.units import normalize_shopping_list
+
+
+def row(name, unit, amount):
+    return {"name": name, "measurement_unit": unit, "amount": amount}
+
+
+def normalize(*rows):
+    return [
+        (line["name"], line["measurement_unit"], line["amount"])
+        for line in normalize_shopping_list(iter(rows))
+    ]
+
+
+@pytest.mark.parametrize(
+    "rows, expected",
+    [
+        ([row("мука", "г", 500)], [("мука", "г", 500)]),
+        (
+            [row("мука", "г", 500), row("мука", "кг", 1)],
+            [("мука", "кг", 1.5)],
+        ),
+        ([row("мука", "кг", 2)], [("мука", "кг", 2)]),
+    ],
+)
+def test_mass_units(rows, expected):
+    assert normalize(*rows) == expected
+
+
+@pytest.mark.parametrize(
+    "rows, expected",
+    [
+        (
+            [row("бульон", "л", 1), row("бульон", "мл", 500)],
+            [("бульон", "л", 1.5)],
+        ),
+        (
+            [row("бульон", "мл", 900), row("бульон", "ст. л.", 2)],
+            [("бульон", "мл", 930)],
+        ),
+        (
+            [row("бульон", "л", 1), row("бульон", "ст. л.", 2)],
+            [("бульон", "л", 1.03)],
+        ),
+    ],
+)
+def test_volume_units(rows, expected):
+    assert normalize(*rows) == expected
+
+
+@pytest.mark.parametrize(
+    "rows, expected",
+    [
+        ([row("уксус", "ч. л.", 1)], [("уксус", "ч. л.", 1)]),
+        ([row("уксус", "ч. л.", 3)], [("уксус", "ст. л.", 1)]),
+        ([row("уксус", "ст. л.", 4)], [("уксус", "ст. л.", 4)]),
+        ([row("уксус", "ст. л.", 5)], [("уксус", "мл", 75)]),
+        (
+            [row("уксус", "ч. л.", 1), row("уксус", "ст. л.", 1)],
+            [("уксус", "мл", 20)],
+        ),
+        ([row("уксус", "ч. л.", 0.5)], [("уксус", "мл", 2.5)]),
+    ],
+)
+def test_spoon_display_limits(rows, expected):
+    assert normalize(*rows) == expected
+
+
+def test_volume_merged_into_mass_by_density():
+    assert normalize(
+        row("мука", "г", 200), row("мука", "стакан", 1)
+    ) == [("мука", "г", 360)]
+
+
+def test_volume_without_density_is_kept_apart():
+    assert normalize(
+        row("бульон", "г", 200), row("бульон", "мл", 300)
+    ) == [("бульон", "г", 200), ("бульон", "мл", 300)]
+
+
+def test_volume_without_mass_is_not_converted():
+    assert normalize(row("молоко", "мл", 250)) == [("молоко", "мл", 250)]
+
+
+def test_to_taste_dropped_next_to_amount():
+    assert normalize(
+        row("соль", "г", 10), row("соль", "по вкусу", 1)
+    ) == [("соль", "г", 10)]
+
+
+def test_to_taste_alone_has_no_amount():
+    assert normalize(row("соль", "по вкусу", 3)) == [
+        ("соль", "по вкусу", None)
+    ]
+
+
+def test_unknown_unit_passes_through():
+    assert normalize(
+        row("яйца куриные", "шт.", 2), row("яйца куриные", "шт.", 3)
+    ) == [("яйца куриные", "шт.", 5)]
+
+
+@pytest.mark.parametrize(
+    "amount, expected",
+    [(1 / 3, 333.33), (0.5, 500), (1.0000001, 1)],
+)
+def test_amount_rounding(amount, expected):
+    (line,) = normalize(row("масло", "кг", amount))
+    assert line[2] == expected
+    assert isinstance(line[2], type(expected))
+
+
+def test_rows_ordered_by_name_and_unit():
+    rows = sorted(
+        [
+            row("мука", "стакан", 1),
+            row("сахар", "ст. л.", 2),
+            row("мука", "кг", 1),
+            row("соль", "по вкусу", 1),
+            row("мука", "г", 100),
+            row("сахар", "г", 50),
+            row("соль", "ч. л.", 1),
+        ],
+        key=lambda line: (line["name"], line["measurement_unit"]),
+    )
+
+    assert normalize(*rows) == [
+        ("мука", "кг", 1.26),
+        ("сахар", "г", 74),
+        ("соль", "ч. л.", 1),
+    ]
@@ -12,8 +12,8 @@ class UserAdmin(admin.ModelAdmin):
         "email",
         "is_staff",
     )
-    search_fields = ("username",)
-    list_filter = ("username", "email")
+    search_fields = ("username", "email")
+    list_filter = ("is_staff",)
     ordering = ("username",)
     empty_value_display = "-пусто-"
 
@@ -21,7 +21,9 @@ class UserAdmin(admin.ModelAdmin):
 @admin.register(Subscription)
 class FollowAdmin(admin.ModelAdmin):
     list_display = ("follower", "author")
-    search_fields = ("follower",)
-    list_filter = ("follower", "author")
-    ordering = ("follower",)
+    list_select_related = ("follower", "author")
+    search_fields = ("follower__username__exact", "author__username__exact")
+    autocomplete_fields = ("follower", "author")
+    ordering = ("-id",)
+    show_full_result_count = False
     empty_value_display = "-пусто-"